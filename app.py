@@ -1,26 +1,67 @@
+import importlib
+import logging
+import sys
+import time
+
 import streamlit as st
 
+from openmatch import profiling, telemetry
+
+log = logging.getLogger("openmatch.app")
+
+# page registry: session_state.page -> module exposing render(). A module is only
+# imported the first time its page is shown, so a cold start loads the landing page alone
+PAGES = {
+    "landing": "landing_page",
+    "projects": "pages.opensource_projects",
+    "stats": "pages.show_stats_page",
+}
+
+
+def page_renderer(page: str):
+    """The page's render callable, importing its module on first use"""
+    module = PAGES[page]
+    if module in sys.modules:
+        # import_module waits for a module another session is still importing, where sys.modules wouldn't
+        return importlib.import_module(module).render
+    started = time.perf_counter()
+    with profiling.phase("import"):
+        render = importlib.import_module(module).render
+    log.info("imported %s in %.0f ms", module, (time.perf_counter() - started) * 1000)
+    return render
+
+
 # Set default page if not set - already set tho 😅
 if 'page' not in st.session_state:
     st.session_state.page = 'landing'
-    
-# Routing logic
-if st.session_state.page == 'landing':
-    import landing_page
-elif st.session_state.page == 'projects':
-    from pages import opensource_projects
-elif st.session_state.page == 'stats':
-    from pages import show_stats_page
-else:
-    st.error("Page not found.")
-    
+
+telemetry.start_from_env()
+rerun = telemetry.mark()
+
+# Routing logic: every rerun renders only the active page
+try:
+    if st.session_state.page in PAGES:
+        with profiling.rerun(st.session_state.page):
+            page_renderer(st.session_state.page)()
+    else:
+        st.error("Page not found.")
+finally:
+    if telemetry.DEBUG_PANEL:
+        from openmatch import ui
+        ui.debug_panel(rerun)
+
 """
     --Supplementary info--
 How it works:
 
 1. Run your app with streamlit run app.py.
 2. The landing page appears first.
-3. Clicking a button sets the page in session state and reruns, so app.py loads the correct module.
-4. All pages use the correct logic and error handling.
+3. Clicking a button sets the page in session state and reruns, so app.py renders the matching page.
+4. Each page module is imported once, on first visit; its render() runs on every rerun.
+5. `python -m openmatch.importtime` measures cold start and per-page import time.
+6. OPENMATCH_DEBUG_PANEL=1 lists the GitHub calls behind each rerun in the sidebar;
+   OPENMATCH_METRICS_PORT serves Prometheus metrics and OPENMATCH_CALL_LOG writes JSON call logs.
+7. OPENMATCH_PROFILE=1 times each rerun per phase and keeps captures of slow ones
+   (`python -m openmatch.profiling` summarizes them).
 
-"""
\ No newline at end of file
+"""
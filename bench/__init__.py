@@ -0,0 +1 @@
+"""Offline benchmarks against a local GitHub stand-in (see run.py)"""
@@ -0,0 +1,100 @@
+"""What the benchmark suite measures: the pages' data functions, alone and per page
+
+Imported by ``run.py`` only after ``OPENMATCH_GITHUB_API`` and the storage
+paths point at the mock server and a scratch directory.  Cases call the page
+modules' own functions (they render nothing), so a page change is measured as
+the page runs it.  Each case takes ``(token, login)``.
+"""
+import shutil
+
+from openmatch import analytics, avatars, cache, commits, ranking, search, snapshot
+from openmatch.userdata import UserData
+from pages import opensource_projects as projects
+from pages import show_stats_page as stats
+
+#  results the projects page shows before "Load more"
+FIRST_BATCH = 9
+REPOSITORY = "repo-0"
+
+
+def reset():
+    """Forget everything cached, on disk and in process, so the next call starts cold"""
+    cache.get_cache().backend.clear()
+    cache.get_store().backend.clear()
+    shutil.rmtree(commits.COMMITS_DIR, ignore_errors=True)
+    analytics._memo.clear()
+    ranking._index_cache.clear()
+    avatars._avatars.clear()
+
+
+# -- single functions
+
+def get_user_info(token, login):
+    return stats.get_user_info(snapshot.get_user_snapshot(token, login))
+
+
+def fetch_commit_history(token, login):
+    # the whole history: one calendar request per year of the account
+    return stats.fetch_commit_history(token, login, snapshot.get_user_snapshot(token, login), None)
+
+
+def fetch_custom_commit_history(token, login):
+    return stats.fetch_custom_commit_history(REPOSITORY, login, token)
+
+
+def get_most_active_day(token, login):
+    return stats.get_most_active_day(token, login)
+
+
+def get_most_used_languages(token, login):
+    return projects.get_most_used_languages(UserData(token, login))
+
+
+def project_pages(token, login):
+    data = UserData(token, login)
+    langs = projects.get_most_used_languages(data)
+    return projects.project_pages(data, langs, search.DEFAULT_FILTERS, per_language=True).ensure(FIRST_BATCH)
+
+
+def issue_pages(token, login):
+    langs = projects.get_most_used_languages(UserData(token, login))
+    return projects.issue_pages(token, langs, per_language=True).ensure(FIRST_BATCH)
+
+
+# -- pages: what one click loads, fetched the way the page fetches it
+
+def stats_full_dashboard(token, login):
+    """The "Full Dashboard" button: every section's fetches, through the page's own ``fetch_plan``"""
+    data = UserData(token, login)
+    results = {}
+    for job, result, error in stats.fetch_plan(data, stats.DEFAULT_HISTORY_DAYS, stats.SECTION_ORDER, REPOSITORY):
+        if error is not None:
+            raise error
+        results[job] = result
+    results["pull_requests"] = stats.get_pull_requests(results["snapshot"])
+    return results
+
+
+def projects_first_search(token, login):
+    """The sidebar's languages, then the first batch of both search buttons"""
+    data = UserData(token, login)
+    langs = projects.get_most_used_languages(data)
+    repos = projects.project_pages(data, langs, search.DEFAULT_FILTERS, per_language=True).ensure(FIRST_BATCH)
+    issues = projects.issue_pages(token, langs, per_language=True).ensure(FIRST_BATCH)
+    return repos, issues
+
+
+FUNCTIONS = {
+    "get_user_info": get_user_info,
+    "fetch_commit_history": fetch_commit_history,
+    "fetch_custom_commit_history": fetch_custom_commit_history,
+    "get_most_active_day": get_most_active_day,
+    "get_most_used_languages": get_most_used_languages,
+    "project_pages": project_pages,
+    "issue_pages": issue_pages,
+}
+PAGES = {
+    "page:stats_full_dashboard": stats_full_dashboard,
+    "page:projects_first_search": projects_first_search,
+}
+CASES = dict(FUNCTIONS, **PAGES)
@@ -0,0 +1,386 @@
+"""Concurrent-session load test of the Streamlit pages against the local GitHub stand-in
+
+    python -m bench.load --sessions 1 5 10 20 --latency 0.05
+
+The app is served by Streamlit's own server, started in this process, and
+every session is a client of it that speaks the browser's protocol: protobuf
+messages on the ``/_stcore/stream`` websocket, widget values sent with each
+rerun the way the frontend sends them.  Nothing of Streamlit is patched, so
+this runs on the pinned version.  Each session, with its own login and token,
+uses two tabs (the pages have no way back to the landing page):
+
+    landing -> projects: connect, search repositories, load more, good first issues
+    landing -> stats: connect, full dashboard, change the history window
+
+All sessions of a level share the server the way sessions share a replica
+(response cache, in-flight coalescing, thread pools, rate-limit scheduler).
+One unmeasured session runs first, and the caches are emptied between levels.
+Per concurrency level it reports throughput (reruns per second), p50/p95/p99
+rerun latency, saturation of the worker pools and of the upstream scheduler
+(peak busy workers and queued jobs, sampled every 20 ms) and resident memory
+growth per session.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from bench.mock_github import MockGitHub, Profile
+from bench.run import _point_app_at
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+SAMPLE_INTERVAL = 0.02
+RERUN_TIMEOUT = 120
+#  the server's own limit (server.maxMessageSize), as the frontend accepts
+MAX_MESSAGE_BYTES = 200 * 2 ** 20
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    """``streamlit run app.py``, headless, on a thread of this process"""
+
+    def __init__(self):
+        self.port = _free_port()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-streamlit", daemon=True)
+        self._server = self._loop = None
+
+    def _run(self):
+        from streamlit.web.server import Server
+
+        async def serve():
+            self._server = Server(APP, f"streamlit run {APP}")
+            await self._server.start()
+            self._loop = asyncio.get_running_loop()
+            self._ready.set()
+            await self._server.stopped
+
+        asyncio.run(serve())
+
+    def __enter__(self):
+        from streamlit.web import bootstrap
+
+        bootstrap.load_config_options({
+            "server_port": self.port,
+            "server_address": "127.0.0.1",
+            "server_headless": True,
+            "server_fileWatcherType": "none",
+            "browser_gatherUsageStats": False,
+        })
+        # as `streamlit run` does, so the pages import from the app's directory
+        if os.path.dirname(APP) not in sys.path:
+            sys.path.insert(0, os.path.dirname(APP))
+        self._thread.start()
+        if not self._ready.wait(30):
+            raise RuntimeError("the Streamlit server did not start")
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._server.stop)
+        self._thread.join(10)
+
+
+class Tab:
+    """One browser tab on the app: a Streamlit session driven over its websocket"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.elements = {}        # delta path -> (element type, element), of the latest run
+        self._states = {}         # widget id -> WidgetState sent with every rerun, as the frontend does
+        self._messages = {}       # hash -> cacheable message, to resolve the references the server sends
+        self._page_hash = ""
+        self._socket = None
+
+    async def open(self):
+        from tornado.websocket import websocket_connect
+
+        self._socket = await websocket_connect(
+            f"ws://127.0.0.1:{self.port}/_stcore/stream", subprotocols=["streamlit"], max_message_size=MAX_MESSAGE_BYTES
+        )
+        return await self.rerun()
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+
+    def widget(self, kind: str, label: str):
+        return next(element for element_kind, element in self.elements.values() if element_kind == kind and label in element.label)
+
+    def widgets(self, kind: str) -> list:
+        return [element for path, (element_kind, element) in sorted(self.elements.items()) if element_kind == kind]
+
+    def set(self, element, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self._states[element.id] = WidgetState(id=element.id, **value)
+
+    def exceptions(self) -> list:
+        return [element.message for kind, element in self.elements.values() if kind == "exception"]
+
+    async def click(self, label: str):
+        return await self.rerun(trigger=self.widget("button", label).id)
+
+    async def rerun(self, trigger: str = None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self._page_hash
+        msg.rerun_script.widget_states.widgets.extend(self._states.values())
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.append(WidgetState(id=trigger, trigger_value=True))
+        await self._socket.write_message(msg.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._until_finished(), RERUN_TIMEOUT)
+        return self
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            payload = await self._socket.read_message()
+            if payload is None:
+                raise RuntimeError("the server closed the session")
+            msg = ForwardMsg.FromString(payload)
+            if msg.WhichOneof("type") == "ref_hash":
+                msg = self._messages.get(msg.ref_hash) or await self._fetch(msg.ref_hash)
+            elif msg.metadata.cacheable:
+                self._messages[msg.hash] = msg
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                # a script run starts (again, after st.experimental_rerun): its elements replace the last run's
+                self.elements = {}
+                self._page_hash = msg.new_session.page_script_hash
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_kind = element.WhichOneof("type")
+                self.elements[tuple(msg.metadata.delta_path)] = (element_kind, getattr(element, element_kind))
+            elif kind == "script_finished" and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return
+
+    async def _fetch(self, ref_hash: str):
+        # a message cached for this session before this tab saw it: fetched over HTTP, as the frontend does
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from tornado.httpclient import AsyncHTTPClient
+
+        response = await AsyncHTTPClient().fetch(f"http://127.0.0.1:{self.port}/_stcore/message?hash={ref_hash}")
+        msg = self._messages[ref_hash] = ForwardMsg.FromString(response.body)
+        return msg
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak, not current, outside Linux: still an upper bound on growth
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class Saturation:
+    """Samples the worker pools and the upstream scheduler on a background thread"""
+
+    def __init__(self):
+        from openmatch import contributions, dashboard, prefetch, ratelimit, resilience
+
+        self.pools = {
+            "fetch": dashboard._executor,
+            "calendar": contributions._pool,
+            "prefetch": prefetch._pool,
+            "hedge": resilience._hedge_pool,
+        }
+        self.scheduler = ratelimit.scheduler
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="load-sampler", daemon=True)
+
+    def _peak(self, name: str, value: int):
+        self.peaks[name] = max(self.peaks.get(name, 0), value)
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            for name, pool in self.pools.items():
+                # idle workers hold a semaphore permit; the others are running a job
+                self._peak(f"{name}_busy", len(pool._threads) - pool._idle_semaphore._value)
+                self._peak(f"{name}_queued", pool._work_queue.qsize())
+            with self.scheduler._cond:
+                self._peak("upstream_in_flight", self.scheduler._in_flight)
+                self._peak("upstream_waiting", sum(len(queue) for queue in self.scheduler._queues.values()))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> dict:
+        sizes = {name: pool._max_workers for name, pool in self.pools.items()}
+        sizes["upstream"] = self.scheduler.max_in_flight
+        return {"peaks": dict(self.peaks), "sizes": sizes}
+
+
+async def _connect(tab: Tab, login: str, token: str):
+    name, secret = tab.widgets("text_input")[:2]
+    tab.set(name, string_value=login)
+    tab.set(secret, string_value=token)
+    return await tab.click("Connect")
+
+
+async def _slide(tab: Tab, label: str, value: float):
+    tab.set(tab.widget("slider", label), double_array_value={"data": [value]})
+    return await tab.rerun()
+
+
+#  (name, interaction) pairs, each one rerun; a name without a colon opens the page in a new tab
+FLOW = [
+    ("projects", lambda tab, login, token: tab.click("Find projects")),
+    ("projects:connect", _connect),
+    ("projects:repositories", lambda tab, login, token: tab.click("Show Matching Repositories")),
+    ("projects:load_more", lambda tab, login, token: tab.click("Load more")),
+    ("projects:issues", lambda tab, login, token: tab.click("Show Good First Issues")),
+    ("stats", lambda tab, login, token: tab.click("show me my stats")),
+    ("stats:connect", _connect),
+    ("stats:full_dashboard", lambda tab, login, token: tab.click("Full Dashboard")),
+    ("stats:history_window", lambda tab, login, token: _slide(tab, "Commit History Days", 365)),
+]
+
+
+async def _step(reruns: list, step: str, interaction) -> Tab:
+    started = time.perf_counter()
+    tab = await interaction
+    reruns.append((step, time.perf_counter() - started))
+    return tab
+
+
+async def run_session(port: int, login: str, token: str, think: float, reruns: list, errors: list, tabs: list):
+    tab = None
+    for step, interact in FLOW:
+        try:
+            if ":" not in step:
+                tab = Tab(port)
+                tabs.append(tab)   # open until the level ends, so its session's memory is counted
+                await _step(reruns, "landing", tab.open())
+            await _step(reruns, step, interact(tab, login, token))
+            errors.extend((step, message) for message in tab.exceptions())
+        except Exception as e:
+            errors.append((step, repr(e)))
+            return
+        if think:
+            await asyncio.sleep(think)
+
+
+async def _run_sessions(port: int, sessions: int, think: float, reruns: list, errors: list) -> int:
+    """Run the level's sessions; resident memory once they are done, before their tabs close"""
+    tabs = []
+    try:
+        await asyncio.gather(*(
+            run_session(port, f"load-{sessions}-{i}", f"token-{sessions}-{i}", think, reruns, errors, tabs)
+            for i in range(sessions)
+        ))
+        return _rss_bytes()
+    finally:
+        for tab in tabs:
+            tab.close()
+
+
+def run_level(mock: MockGitHub, server: AppServer, sessions: int, think: float) -> dict:
+    reruns, errors = [], []
+    mock.reset_stats()
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    with Saturation() as saturation:
+        rss_after = asyncio.run(_run_sessions(server.port, sessions, think, reruns, errors))
+    elapsed = time.perf_counter() - started
+    rss_growth = max(0, rss_after - rss_before)
+
+    latencies = [seconds * 1000 for _, seconds in reruns]
+    per_step = {}
+    for step, seconds in reruns:
+        per_step.setdefault(step, []).append(seconds * 1000)
+    return {
+        "sessions": sessions,
+        "reruns": len(reruns),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "seconds": round(elapsed, 2),
+        "throughput": round(len(reruns) / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 0.50)),
+        "p95_ms": round(_percentile(latencies, 0.95)),
+        "p99_ms": round(_percentile(latencies, 0.99)),
+        "step_median_ms": {step: round(statistics.median(values)) for step, values in per_step.items()},
+        "saturation": saturation.summary(),
+        "rss_per_session_mib": round(rss_growth / sessions / 2 ** 20, 2),
+        "round_trips": mock.stats()["round_trips"],
+    }
+
+
+def _print_level(result: dict):
+    peaks, sizes = result["saturation"]["peaks"], result["saturation"]["sizes"]
+    print(
+        f"{result['sessions']:>8} {result['reruns']:>7} {result['errors']:>6} {result['throughput']:>10.1f}"
+        f" {result['p50_ms']:>7} {result['p95_ms']:>7} {result['p99_ms']:>7}"
+        f" {peaks.get('fetch_busy', 0):>4}/{sizes['fetch']:<3} {peaks.get('fetch_queued', 0):>6}"
+        f" {peaks.get('upstream_in_flight', 0):>4}/{sizes['upstream']:<3} {peaks.get('upstream_waiting', 0):>7}"
+        f" {result['rss_per_session_mib']:>9.2f} {result['round_trips']:>7}"
+    )
+    for step, message in result["error_samples"]:
+        print(f"         error in {step}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent browser sessions through the pages")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20], help="concurrency levels, in order")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the mock adds to every response")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--think", type=float, default=0.0, help="seconds a session waits between interactions")
+    parser.add_argument("--no-warmup", action="store_true", help="don't run one unmeasured session first")
+    parser.add_argument("--json", help="also write the full results (per-step medians, every peak) here")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="openmatch-load-")
+    results = []
+    with contextlib.ExitStack() as stack:
+        mock = stack.enter_context(MockGitHub(Profile(), latency=args.latency, jitter=args.jitter))
+        cases = _point_app_at(mock, workdir, prefetch=True)
+        server = stack.enter_context(AppServer())
+        print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'reruns/s':>10} {'p50ms':>7} {'p95ms':>7} {'p99ms':>7}"
+              f" {'fetch':>8} {'queued':>6} {'upstream':>8} {'waiting':>7} {'MiB/sess':>9} {'trips':>7}")
+        if not args.no_warmup:
+            # pays for the pages' imports and one-time setup, which would otherwise land on the first level
+            run_level(mock, server, 1, 0)
+        for sessions in args.sessions:
+            cases.reset()
+            result = run_level(mock, server, sessions, args.think)
+            results.append(result)
+            _print_level(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
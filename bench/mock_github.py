@@ -0,0 +1,474 @@
+"""Local stand-in for the GitHub GraphQL and REST APIs, for offline benchmarks
+
+    python -m bench.mock_github --port 8765 --latency 0.05
+    python -m bench.mock_github --record bench/fixtures --upstream https://api.github.com
+
+Point the app at it with ``OPENMATCH_GITHUB_API=http://127.0.0.1:8765``.  Each
+request is answered from, in order:
+
+1. recorded fixtures (``*.json`` in the fixtures directory), matched on the
+   normalized query and its variables (GraphQL) or on the path and parameters
+   (REST).  With ``--upstream`` and ``--record``, requests without a fixture are
+   forwarded to GitHub and their answers saved as new fixtures (the token is
+   never written);
+2. a deterministic synthetic account sized by ``Profile``, paginated like
+   GitHub (opaque cursors, ``first`` capped at 100).
+
+Every counted response carries ``X-RateLimit-*`` headers, spent per token; an
+empty budget answers 403 until the window resets.  REST responses carry an
+``ETag`` and answer ``If-None-Match`` with a free 304.  ``stats()`` counts round
+trips and bytes in both directions, per operation.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from openmatch import cache
+
+MAX_PAGE_SIZE = 100
+RATE_LIMIT_WINDOW = 3600
+LANGUAGES = ["Python", "TypeScript", "Go", "Rust", "Java", "C++", "Shell", "HTML"]
+EVENT_TYPES = ["PushEvent", "PullRequestEvent", "IssuesEvent", "IssueCommentEvent", "CreateEvent", "WatchEvent"]
+#  headers worth keeping in a recorded fixture
+RECORDED_HEADERS = ("ETag", "Link", "X-Poll-Interval")
+
+_EVENTS_PATH = re.compile(r"^/users/([^/]+)/events$")
+_ALIAS = re.compile(r"(o\d+): repositoryOwner\(")
+
+
+class Profile:
+    """Size of the synthetic account (and of the search results it is shown)"""
+
+    def __init__(self, login="octo-bench", repos=250, search_results=300, commits=2500, events=300, years=10):
+        self.login = login
+        self.repos = repos
+        self.search_results = search_results
+        self.commits = commits
+        self.events = min(events, 300)   # GitHub never serves more
+        self.years = years
+
+
+def _page(total: int, variables: dict):
+    """``(offset, count, pageInfo)`` for a cursor-paginated connection"""
+    offset = int(variables.get("after") or 0)
+    count = max(0, min(variables.get("first") or MAX_PAGE_SIZE, MAX_PAGE_SIZE, total - offset))
+    page_info = {"hasNextPage": offset + count < total, "endCursor": str(offset + count) if count else None}
+    return offset, count, page_info
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Synthetic:
+    """Deterministic answers for every query the app sends"""
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+        # a fixed "now" per server, so repeated runs see the same account
+        self.now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    # -- data
+
+    def _languages(self, i: int) -> dict:
+        picks = [LANGUAGES[(i + k) % len(LANGUAGES)] for k in range(1 + i % 3)]
+        return {"edges": [{"size": 40000 // (k + 1) + 97 * i, "node": {"name": name}} for k, name in enumerate(picks)]}
+
+    def _repository(self, i: int, with_languages: bool) -> dict:
+        node = {
+            "name": f"repo-{i}",
+            "nameWithOwner": f"{self.profile.login}/repo-{i}",
+            "pushedAt": _stamp(self.now - timedelta(days=3 * i)),
+        }
+        if with_languages:
+            node["languages"] = self._languages(i)
+        return node
+
+    def _day_count(self, day: date) -> int:
+        return (day.toordinal() * 7919) % 11 % 6
+
+    def _calendar(self, start: date, end: date) -> dict:
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        return {"weeks": [
+            {"contributionDays": [
+                {"date": str(day), "contributionCount": self._day_count(day), "weekday": (day.weekday() + 1) % 7}
+                for day in days[n:n + 7]
+            ]}
+            for n in range(0, len(days), 7)
+        ]}
+
+    def _created_at(self) -> str:
+        return _stamp(self.now - timedelta(days=365 * self.profile.years))
+
+    def _search_node(self, kind: str, language: str, i: int) -> dict:
+        owner = {"login": f"owner-{i % 40}", "avatarUrl": f"https://avatars.example/{i % 40}.png"}
+        if kind == "ISSUE":
+            return {
+                "title": f"Good first issue #{i} ({language})",
+                "body": "Steps to reproduce... " * (1 + i % 4),
+                "url": f"https://github.example/{owner['login']}/{language}-{i}/issues/{i}",
+                "repository": {"name": f"{language}-{i}", "owner": {"login": owner["login"]}},
+            }
+        return {
+            "id": f"R_{language}_{i}",
+            "name": f"{language}-project-{i}",
+            "description": f"A {language} project, number {i}",
+            "stargazerCount": 20000 // (i + 1),
+            "forkCount": 3000 // (i + 1),
+            "url": f"https://github.example/{owner['login']}/{language}-project-{i}",
+            "pushedAt": _stamp(self.now - timedelta(hours=7 * i)),
+            "updatedAt": _stamp(self.now - timedelta(hours=5 * i)),
+            "owner": owner,
+            "primaryLanguage": {"name": language},
+            "languages": {"edges": [{"size": 50000, "node": {"name": language}}, {"size": 900, "node": {"name": "Shell"}}]},
+            "goodFirstIssues": {"totalCount": i % 7},
+        }
+
+    def _commit(self, i: int) -> dict:
+        return {
+            "oid": hashlib.sha1(f"commit-{i}".encode()).hexdigest(),
+            "message": f"Change {i}\n\nDetails of change {i}.",
+            "committedDate": _stamp(self.now - timedelta(hours=3 * i)),
+            "additions": (i * 37) % 400,
+            "deletions": (i * 17) % 150,
+            "changedFilesIfAvailable": 1 + i % 9,
+            "author": {"name": "Bench Author", "email": "bench@example.com", "user": {"login": self.profile.login}},
+        }
+
+    # -- GraphQL
+
+    def graphql(self, query: str, variables: dict):
+        """``(operation, data)``"""
+        profile = self.profile
+        if "UserSnapshot" in query:
+            return "user_snapshot", self._snapshot()
+        if "search(" in query:
+            kind = "ISSUE" if "type: ISSUE" in query else "REPOSITORY"
+            languages = re.findall(r"language:(\S+)", variables.get("q", "")) or ["any"]
+            offset, count, page_info = _page(profile.search_results, variables)
+            # several languages interleave, like a real combined search
+            edges = [{"node": self._search_node(kind, languages[i % len(languages)], i)} for i in range(offset, offset + count)]
+            return ("issues" if kind == "ISSUE" else "search"), {"search": {"pageInfo": page_info, "edges": edges}}
+        if "repositoryOwner(" in query:
+            return "owner_avatars", {
+                alias: {"avatarUrl": f"https://avatars.example/{variables[alias]}.png"} for alias in _ALIAS.findall(query)
+            }
+        if "contributionsCollection(from: $from" in query:
+            start = date.fromisoformat(variables["from"][:10])
+            end = date.fromisoformat(variables["to"][:10])
+            return "contribution_calendar", {"user": {"contributionsCollection": {"contributionCalendar": self._calendar(start, end)}}}
+        if "history(first: $first" in query:
+            offset, count, page_info = _page(profile.commits, variables)
+            history = {"totalCount": profile.commits, "pageInfo": page_info, "nodes": [self._commit(i) for i in range(offset, offset + count)]}
+            return "repo_history", {"repository": {"defaultBranchRef": {"target": {"history": history}}}}
+        if "repositories(first: $first" in query:
+            offset, count, page_info = _page(profile.repos, variables)
+            nodes = [self._repository(i, "languages(first" in query) for i in range(offset, offset + count)]
+            op = "language_profile" if "languages(first" in query else "repository_names"
+            return op, {"user": {"repositories": {"pageInfo": page_info, "nodes": nodes}}}
+        if "createdAt" in query:
+            return "user_created_at", {"user": {"createdAt": self._created_at()}}
+        return "unknown", None
+
+    def _snapshot(self) -> dict:
+        profile = self.profile
+        today = self.now.date()
+        calendar = self._calendar(today - timedelta(days=364), today)
+        total = sum(day["contributionCount"] for week in calendar["weeks"] for day in week["contributionDays"])
+        offset, count, page_info = _page(profile.repos, {"first": 100})
+        user = {
+            "login": profile.login,
+            "name": "Bench User",
+            "email": "bench@example.com",
+            "avatarUrl": "https://avatars.example/bench.png",
+            "bio": "Synthetic account for benchmarks",
+            "createdAt": self._created_at(),
+            "location": "Localhost",
+            "websiteUrl": None,
+            "publicRepos": {"totalCount": profile.repos},
+            "privateRepos": {"totalCount": 0},
+            "pullRequests": {"totalCount": 321},
+            "issues": {"totalCount": 123},
+            "contributionsCollection": {
+                "totalCommitContributions": total,
+                "totalIssueContributions": 12,
+                "totalPullRequestContributions": 34,
+                "contributionCalendar": dict(calendar, totalContributions=total),
+                "pullRequestContributionsByRepository": [
+                    {"contributions": {"totalCount": 25 - i}, "repository": {"name": f"repo-{i}"}} for i in range(25)
+                ],
+            },
+            "repositories": {
+                "totalCount": profile.repos,
+                "pageInfo": page_info,
+                "nodes": [self._repository(i, True) for i in range(offset, offset + count)],
+            },
+        }
+        return {"user": user}
+
+    # -- REST
+
+    def rest(self, path: str, params: dict):
+        """``(operation, status, body)``"""
+        match = _EVENTS_PATH.match(path)
+        if not match:
+            return "unknown", 404, {"message": "Not Found"}
+        per_page = min(int(params.get("per_page", 30)), MAX_PAGE_SIZE)
+        page = int(params.get("page", 1))
+        start = (page - 1) * per_page
+        events = [
+            {
+                "id": str(9_000_000 - i),
+                "type": EVENT_TYPES[i % len(EVENT_TYPES)],
+                "created_at": _stamp(self.now - timedelta(minutes=37 * i)),
+                "actor": {"login": match.group(1)},
+                "repo": {"name": f"{self.profile.login}/repo-{i % 20}"},
+            }
+            for i in range(start, min(start + per_page, self.profile.events))
+        ]
+        return "user_events", 200, events
+
+
+class Fixtures:
+    """Recorded answers, one JSON file per request"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self.entries = {}
+        if directory and os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".json"):
+                    with open(os.path.join(directory, name)) as f:
+                        fixture = json.load(f)
+                    self.entries[self.key(fixture["request"])] = fixture
+
+    @staticmethod
+    def key(request: dict) -> str:
+        if request["kind"] == "graphql":
+            return cache.make_key("graphql", request["query"], request.get("variables"))
+        return cache.make_key("rest", request["path"], request.get("params"))
+
+    def get(self, request: dict):
+        return self.entries.get(self.key(request))
+
+    def save(self, request: dict, op: str, response: dict):
+        fixture = {"request": request, "op": op, "response": response}
+        key = self.key(request)
+        self.entries[key] = fixture
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{op}-{key.rsplit(':', 1)[-1][:16]}.json"), "w") as f:
+            json.dump(fixture, f, indent=1)
+
+
+class MockGitHub:
+    def __init__(self, profile: Profile = None, fixtures: str = None, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit: int = 5000, upstream: str = None, record: str = None, port: int = 0):
+        self.synthetic = Synthetic(profile or Profile())
+        self.fixtures = Fixtures(record or fixtures)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.recording = bool(record and upstream)
+        self._lock = threading.Lock()
+        self._budgets = {}   # token digest -> (remaining, reset epoch)
+        self._random = random.Random(0)
+        self.reset_stats()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-github", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -- accounting
+
+    def reset_stats(self):
+        with self._lock:
+            self._requests = Counter()
+            self._bytes_in = Counter()
+            self._bytes_out = Counter()
+
+    def stats(self) -> dict:
+        """Round trips and bytes so far, in total and per operation"""
+        with self._lock:
+            ops = sorted(self._requests)
+            return {
+                "round_trips": sum(self._requests.values()),
+                "bytes_in": sum(self._bytes_in.values()),
+                "bytes_out": sum(self._bytes_out.values()),
+                "ops": {op: {"round_trips": self._requests[op], "bytes_out": self._bytes_out[op]} for op in ops},
+            }
+
+    def _count(self, op: str, bytes_in: int, bytes_out: int):
+        with self._lock:
+            self._requests[op] += 1
+            self._bytes_in[op] += bytes_in
+            self._bytes_out[op] += bytes_out
+
+    def _spend(self, authorization: str):
+        """Charge one request to the token's budget: ``(remaining, reset, limit exceeded)``"""
+        digest = hashlib.sha256((authorization or "").encode()).hexdigest()
+        now = time.time()
+        with self._lock:
+            remaining, reset = self._budgets.get(digest, (self.rate_limit, now + RATE_LIMIT_WINDOW))
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + RATE_LIMIT_WINDOW
+            exceeded = remaining <= 0
+            remaining = max(0, remaining - 1)
+            self._budgets[digest] = (remaining, reset)
+        return remaining, int(reset), exceeded
+
+    def _rate_limit_block(self, authorization: str) -> dict:
+        """What a query's ``rateLimit`` field reports: the budget after this request, which costs 1"""
+        digest = hashlib.sha256((authorization or "").encode()).hexdigest()
+        now = time.time()
+        with self._lock:
+            remaining, reset = self._budgets.get(digest, (self.rate_limit, now + RATE_LIMIT_WINDOW))
+        if now >= reset:
+            remaining, reset = self.rate_limit, now + RATE_LIMIT_WINDOW
+        return {"cost": 1, "remaining": max(0, remaining - 1), "resetAt": _stamp(datetime.fromtimestamp(reset, timezone.utc))}
+
+    # -- answering
+
+    def _answer(self, request: dict, headers: dict):
+        """``(operation, status, body, extra headers)`` for one parsed request"""
+        fixture = self.fixtures.get(request)
+        if fixture is not None:
+            response = fixture["response"]
+            return fixture.get("op", "fixture"), response["status"], response["body"], dict(response.get("headers") or {})
+        if self.recording:
+            return self._forward(request, headers)
+        if request["kind"] == "graphql":
+            op, data = self.synthetic.graphql(request["query"], request.get("variables") or {})
+            if data is None:
+                return op, 200, {"errors": [{"message": "query not understood by the mock"}]}, {}
+            if "rateLimit {" in request["query"]:
+                data = dict(data, rateLimit=self._rate_limit_block(headers.get("Authorization")))
+            return op, 200, {"data": data}, {}
+        op, status, body = self.synthetic.rest(request["path"], request.get("params") or {})
+        return op, status, body, {}
+
+    def _forward(self, request: dict, headers: dict):
+        upstream_headers = {"Authorization": headers.get("Authorization", ""), "Accept": headers.get("Accept", "application/json")}
+        if request["kind"] == "graphql":
+            response = requests.post(f"{self.upstream}/graphql", json={"query": request["query"], "variables": request.get("variables")},
+                                     headers=upstream_headers, timeout=30)
+            op = "graphql"
+        else:
+            response = requests.get(self.upstream + request["path"], params=request.get("params"), headers=upstream_headers, timeout=30)
+            op = "rest"
+        kept = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        recorded = {"status": response.status_code, "headers": kept, "body": response.json() if response.content else None}
+        if response.ok:
+            self.fixtures.save(request, op, recorded)
+        return op, recorded["status"], recorded["body"], kept
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, request: dict, bytes_in: int):
+                if mock.latency or mock.jitter:
+                    time.sleep(mock.latency + mock.jitter * mock._random.random())
+                op, status, body, extra = mock._answer(request, self.headers)
+                payload = json.dumps(body, separators=(",", ":")).encode()
+                etag = extra.pop("ETag", None) or '"%s"' % hashlib.sha1(payload).hexdigest()
+                if request["kind"] == "rest" and self.headers.get("If-None-Match") == etag:
+                    # conditional hits are free on GitHub
+                    status, payload = 304, b""
+                    remaining, reset, exceeded = None, None, False
+                else:
+                    remaining, reset, exceeded = mock._spend(self.headers.get("Authorization"))
+                if exceeded:
+                    status, payload = 403, json.dumps({"message": "API rate limit exceeded"}).encode()
+                mock._count(op, bytes_in, len(payload))
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if request["kind"] == "rest":
+                    self.send_header("ETag", etag)
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                if reset is not None:
+                    self.send_header("X-RateLimit-Limit", str(mock.rate_limit))
+                    self.send_header("X-RateLimit-Remaining", str(remaining))
+                    self.send_header("X-RateLimit-Reset", str(reset))
+                    self.send_header("X-RateLimit-Resource", request["kind"] if request["kind"] == "graphql" else "core")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                body = json.loads(raw or b"{}")
+                request = {"kind": "graphql", "query": body.get("query", ""), "variables": body.get("variables") or {}}
+                self._respond(request, len(raw))
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                request = {"kind": "rest", "path": parts.path, "params": dict(parse_qsl(parts.query))}
+                self._respond(request, len(self.path))
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local GitHub stand-in for offline benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, at random")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requests per token per hour")
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--upstream", help="forward unknown requests here (e.g. https://api.github.com)")
+    parser.add_argument("--record", help="save forwarded answers to this fixtures directory")
+    parser.add_argument("--repos", type=int, default=Profile().repos)
+    parser.add_argument("--search-results", type=int, default=Profile().search_results)
+    parser.add_argument("--commits", type=int, default=Profile().commits)
+    args = parser.parse_args()
+
+    profile = Profile(repos=args.repos, search_results=args.search_results, commits=args.commits)
+    mock = MockGitHub(profile, fixtures=args.fixtures, latency=args.latency, jitter=args.jitter,
+                      rate_limit=args.rate_limit, upstream=args.upstream, record=args.record, port=args.port).start()
+    print(f"mock GitHub on {mock.url} (OPENMATCH_GITHUB_API={mock.url}); Ctrl-C to stop")
+    try:
+        mock._thread.join()
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
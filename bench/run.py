@@ -0,0 +1,189 @@
+"""Offline benchmark suite: the pages' data functions against the local GitHub stand-in
+
+    python -m bench.run                    # compare with bench/baseline.json, exit 1 on regressions
+    python -m bench.run --gate-times       # fail on slower wall times too, not only on traffic and memory
+    python -m bench.run --save-baseline    # accept the current numbers as the new baseline
+    python -m bench.run --only project_pages --runs 10 --latency 0.05
+
+Every case (see ``cases.py``) is measured from cold caches: the response
+cache, the commit store and the in-process memos are wiped before each run.
+Reported per case:
+
+* ``cold_ms`` / ``warm_ms``: fastest wall time, over the runs, of a cold call
+  and of the same call repeated right after it (the minimum: scheduler and GC
+  noise only ever add time);
+* ``round_trips`` / ``warm_round_trips``: requests that reached the mock;
+* ``bytes``: request plus response bodies on the wire, cold;
+* ``alloc_peak_kib``: peak traced Python memory during one cold call
+  (``tracemalloc``; measured in a separate run, since tracing slows it down).
+
+Round trips, bytes and allocations do not depend on the machine, and are what
+the suite fails on by default.  Wall times do, and a warm call of a few
+milliseconds moves by several of them between identical runs: they are only
+checked with ``--gate-times``, against a baseline saved on the same machine.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.mock_github import MockGitHub, Profile
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+TOKEN = "bench-token"
+#  how much worse than the baseline each metric may get (relative) before the suite fails;
+#  the *_ms ones only apply with --gate-times
+TOLERANCES = {
+    "cold_ms": 0.25,
+    "warm_ms": 0.25,
+    "round_trips": 0.0,
+    "warm_round_trips": 0.0,
+    "bytes": 0.10,
+    "alloc_peak_kib": 0.25,
+}
+#  time differences below this are noise, whatever the ratio
+MIN_MS_DELTA = 15.0
+COLUMNS = ["cold_ms", "warm_ms", "round_trips", "warm_round_trips", "bytes", "alloc_peak_kib"]
+
+
+def _point_app_at(mock: MockGitHub, workdir: str, prefetch: bool = False):
+    """Send the app's requests to ``mock`` and keep its stores in ``workdir``, then import the cases"""
+    os.environ.update({
+        "OPENMATCH_GITHUB_API": mock.url,
+        "OPENMATCH_CACHE_URL": f"sqlite:///{os.path.join(workdir, 'cache.sqlite3')}",
+        "OPENMATCH_COMMITS_DIR": os.path.join(workdir, "commits"),
+        "OPENMATCH_INDEX_PATH": os.path.join(workdir, "repo_index.sqlite3"),
+        "OPENMATCH_PREFETCH": "1" if prefetch else "0",
+    })
+    if "openmatch.client" in sys.modules:
+        raise RuntimeError("openmatch was imported before the benchmark could point it at the mock")
+    return importlib.import_module("bench.cases")
+
+
+def _timed(mock: MockGitHub, fn, login: str):
+    mock.reset_stats()
+    started = time.perf_counter()
+    fn(TOKEN, login)
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, mock.stats()
+
+
+def measure(cases, mock: MockGitHub, fn, login: str, runs: int) -> dict:
+    cold, warm = [], []
+    for _ in range(runs):
+        cases.reset()
+        elapsed, cold_stats = _timed(mock, fn, login)
+        cold.append(elapsed)
+        elapsed, warm_stats = _timed(mock, fn, login)
+        warm.append(elapsed)
+
+    cases.reset()
+    tracemalloc.start()
+    try:
+        fn(TOKEN, login)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "cold_ms": round(min(cold), 1),
+        "warm_ms": round(min(warm), 1),
+        "round_trips": cold_stats["round_trips"],
+        "warm_round_trips": warm_stats["round_trips"],
+        "bytes": cold_stats["bytes_in"] + cold_stats["bytes_out"],
+        "alloc_peak_kib": round(peak / 1024),
+        "ops": cold_stats["ops"],
+    }
+
+
+def regressions(results: dict, baseline: dict, time_tolerance: float = None, gate_times: bool = False) -> list:
+    """``[(case, metric, baseline, now), ...]`` for every metric worse than allowed"""
+    found = []
+    for name, metrics in results.items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+        for metric, tolerance in TOLERANCES.items():
+            if metric not in before or (metric.endswith("_ms") and not gate_times):
+                continue
+            if metric.endswith("_ms") and time_tolerance is not None:
+                tolerance = time_tolerance
+            limit = before[metric] * (1 + tolerance)
+            if metric.endswith("_ms"):
+                limit = max(limit, before[metric] + MIN_MS_DELTA)
+            if metrics[metric] > limit:
+                found.append((name, metric, before[metric], metrics[metric]))
+    return found
+
+
+def _print_table(results: dict, baseline: dict):
+    print(f"{'case':<30}" + "".join(f"{column:>18}" for column in COLUMNS))
+    for name, metrics in results.items():
+        before = baseline.get("cases", {}).get(name, {})
+        cells = []
+        for column in COLUMNS:
+            cell = f"{metrics[column]:g}"
+            if column in before and before[column]:
+                cell += f" ({(metrics[column] - before[column]) / before[column]:+.0%})"
+            cells.append(f"{cell:>18}")
+        print(f"{name:<30}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the pages' data functions")
+    parser.add_argument("--runs", type=int, default=5, help="cold runs per case (fastest reported)")
+    parser.add_argument("--only", nargs="*", help="case names to run (default: all)")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the mock adds to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="recorded fixtures to replay before falling back to synthetic data")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--gate-times", action="store_true", help="also fail on wall times slower than the baseline")
+    parser.add_argument("--tolerance", type=float, help="allowed relative slowdown of wall times (default 0.25; implies --gate-times)")
+    parser.add_argument("--json", help="also write the full results (with per-operation counts) here")
+    args = parser.parse_args()
+
+    profile = Profile()
+    workdir = tempfile.mkdtemp(prefix="openmatch-bench-")
+    with MockGitHub(profile, fixtures=args.fixtures, latency=args.latency, jitter=args.jitter) as mock:
+        cases = _point_app_at(mock, workdir)
+        names = args.only or list(cases.CASES)
+        results = {name: measure(cases, mock, cases.CASES[name], profile.login, args.runs) for name in names}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    _print_table(results, {} if args.save_baseline else baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.save_baseline:
+        saved = dict(baseline.get("cases", {}))
+        saved.update({name: {k: v for k, v in metrics.items() if k != "ops"} for name, metrics in results.items()})
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "runs": args.runs, "latency": args.latency}
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": meta, "cases": saved}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("no baseline yet: run with --save-baseline to create one")
+        return 0
+    if baseline.get("meta", {}).get("latency") not in (None, args.latency):
+        print(f"note: the baseline was recorded with --latency {baseline['meta']['latency']}")
+    found = regressions(results, baseline, args.tolerance, args.gate_times or args.tolerance is not None)
+    for name, metric, before, now in found:
+        print(f"REGRESSION {name}: {metric} {before:g} -> {now:g}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared building blocks for the OpenMatch pages (GitHub access, caching, analytics)"""
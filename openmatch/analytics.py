@@ -0,0 +1,116 @@
+"""Columnar analytics over a user's daily contribution series
+
+``ContributionStats`` packs the ``[(date, count), ...]`` series into NumPy
+arrays once and precomputes everything the dashboard draws: weekday and
+ISO-week aggregates (the heatmap matrix), current and longest streaks, rolling
+7/30-day averages and per-day percentile ranks.  ``for_user`` memoizes it per
+revision of the contribution store, so reruns that don't bring new data reuse
+the same arrays.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from openmatch import contributions
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+ROLLING_WINDOWS = (7, 30)
+MEMO_SIZE = 64
+
+
+def _rolling_mean(counts: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` days (shorter at the start of the series)"""
+    totals = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    ends = np.arange(1, counts.size + 1)
+    starts = np.maximum(ends - window, 0)
+    return (totals[ends] - totals[starts]) / (ends - starts)
+
+
+def _runs(active: np.ndarray):
+    """Start and end (exclusive) index of every run of True"""
+    edges = np.diff(np.concatenate(([False], active, [False])).astype(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class ContributionStats:
+    """Precomputed aggregates of one daily series, oldest day first"""
+
+    def __init__(self, days: list):
+        self.dates = np.array([day for day, _ in days], dtype="datetime64[D]")
+        self.counts = np.array([count for _, count in days], dtype=np.int64)
+        n = self.counts.size
+
+        # 1970-01-01 was a Thursday, so Monday = 0
+        self.weekdays = (self.dates.astype(np.int64) + 3) % 7
+        self.weekday_totals = np.bincount(self.weekdays, weights=self.counts, minlength=7).astype(np.int64)
+        days_per_weekday = np.bincount(self.weekdays, minlength=7)
+        self.weekday_means = self.weekday_totals / np.maximum(days_per_weekday, 1)
+
+        # heatmap: one row per Monday-started week, one column per weekday
+        if n:
+            first_monday = self.dates[0] - self.weekdays[0]
+            week_index = (self.dates - first_monday).astype(np.int64) // 7
+            self.week_starts = first_monday + 7 * np.arange(week_index[-1] + 1)
+            self.week_matrix = np.full((self.week_starts.size, 7), np.nan)
+            self.week_matrix[week_index, self.weekdays] = self.counts
+            self.week_totals = np.bincount(week_index, weights=self.counts).astype(np.int64)
+            iso = pd.DatetimeIndex(self.week_starts).isocalendar()
+            self.week_labels = [f"{year}-W{week:02d}" for year, week in zip(iso["year"], iso["week"])]
+        else:
+            self.week_starts = np.array([], dtype="datetime64[D]")
+            self.week_matrix = np.empty((0, 7))
+            self.week_totals = np.array([], dtype=np.int64)
+            self.week_labels = []
+
+        active = self.counts > 0
+        starts, ends = _runs(active)
+        lengths = ends - starts
+        self.longest_streak = int(lengths.max()) if lengths.size else 0
+        # today may still be empty without breaking the streak
+        last = n - 1 if n and active[-1] else n - 2
+        self.current_streak = int(lengths[-1]) if lengths.size and ends[-1] - 1 == last else 0
+
+        self.rolling = {window: _rolling_mean(self.counts, window) for window in ROLLING_WINDOWS}
+        ordered = np.sort(self.counts)
+        self.percentiles = 100.0 * np.searchsorted(ordered, self.counts, side="right") / max(n, 1)
+
+        self.total = int(self.counts.sum())
+        self.active_days = int(active.sum())
+
+    def __len__(self):
+        return int(self.counts.size)
+
+    def frame(self) -> pd.DataFrame:
+        """Daily counts with rolling averages and percentile ranks, indexed by date"""
+        data = {"Commits": self.counts}
+        for window, values in self.rolling.items():
+            data[f"{window}-day average"] = values
+        data["Percentile"] = self.percentiles
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.dates, name="Date"))
+
+    def busiest_weekday(self) -> str:
+        return WEEKDAYS[int(self.weekday_totals.argmax())] if self.total else "-"
+
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def for_user(token: str, login: str, num_days: int = None, since: date = None) -> ContributionStats:
+    """Stats for the last ``num_days`` days (None: since the account was created)"""
+    start = date.today() - timedelta(days=num_days) if num_days else None
+    days = contributions.daily_counts(token, login, start=start, since=since)
+    key = (contributions.revision(token, login), days[0][0] if days else None, len(days))
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    stats = ContributionStats(days)
+    with _memo_lock:
+        _memo[key] = stats
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return stats
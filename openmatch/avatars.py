@@ -0,0 +1,47 @@
+"""Owner avatar lookups, batched and cached across sessions"""
+import threading
+
+from cachetools import TTLCache
+
+from openmatch import client
+
+AVATAR_TTL = 24 * 3600
+BATCH_SIZE = 50
+
+#  owner login (lowercased) -> avatar url, shared by every session in this process
+_avatars = TTLCache(maxsize=10000, ttl=AVATAR_TTL)
+_lock = threading.Lock()
+
+
+def remember(owner: str, avatar_url: str):
+    """Store an avatar we already got for free, e.g. from a search result"""
+    if owner and avatar_url:
+        with _lock:
+            _avatars[owner.lower()] = avatar_url
+
+
+def _batch_query(owners):
+    # one aliased field per owner; repositoryOwner covers users and organizations alike
+    params = ", ".join(f"$o{i}: String!" for i in range(len(owners)))
+    fields = "\n".join(f"o{i}: repositoryOwner(login: $o{i}) {{ avatarUrl }}" for i in range(len(owners)))
+    query = f"query({params}) {{\n{fields}\nrateLimit {{ cost remaining resetAt }}\n}}"
+    return query, {f"o{i}": owner for i, owner in enumerate(owners)}
+
+
+def get_owner_avatars(token: str, owners) -> dict:
+    """Return ``{owner: avatar_url}``, fetching every unknown owner in one aliased query"""
+    owners = list(dict.fromkeys(o for o in owners if o))
+    with _lock:
+        found = {o: _avatars[o.lower()] for o in owners if o.lower() in _avatars}
+    missing = [o for o in owners if o not in found]
+
+    for start in range(0, len(missing), BATCH_SIZE):
+        batch = missing[start:start + BATCH_SIZE]
+        query, variables = _batch_query(batch)
+        data = client.graphql(token, query, variables, op="owner_avatars")
+        for i, owner in enumerate(batch):
+            node = data.get(f"o{i}")
+            if node and node.get("avatarUrl"):
+                remember(owner, node["avatarUrl"])
+                found[owner] = node["avatarUrl"]
+    return found
@@ -0,0 +1,276 @@
+"""Persistent response cache shared by processes and replicas
+
+Entries are JSON envelopes ``{"v": value, "t": stored_at}`` kept in a pluggable
+backend.  The default backend is a SQLite file (survives restarts and is shared by
+every worker on the host); ``OPENMATCH_CACHE_URL=redis://host:port/db`` switches to
+any Redis-protocol server so replicas share one cache.
+
+Freshness is decided per query type (``op``): younger than its TTL is a hit, up to
+``STALE_FACTOR`` TTLs older is served stale while a background refresh runs, and
+anything older is a miss.
+
+Data that accumulates over time instead of being re-fetched (the event history,
+stored contribution calendars, language profiles) lives in ``get_store()``: the
+same backend, but a separate table (SQLite) or key prefix (Redis) that is never
+expired or evicted.  With Redis, use a ``volatile-*`` maxmemory policy so memory
+pressure only evicts cache entries, which are the ones with an expiry.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from openmatch import telemetry
+
+DEFAULT_URL = "sqlite:///.openmatch/cache.sqlite3"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+STALE_FACTOR = 4
+
+#  seconds each kind of query stays fresh
+TTLS = {
+    "user_snapshot": 600,
+    "search": 120,
+    "issues": 120,
+    "default": 300,
+}
+
+#  scope of entries every token may read (public data only)
+PUBLIC_SCOPE = "public"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def token_scope(token: str) -> str:
+    """Fingerprint a token so cache entries never mix what different tokens can see"""
+    return hashlib.sha256((token or "").encode()).hexdigest()[:16]
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def make_key(op: str, query: str, variables: dict = None, scope: str = "") -> str:
+    """Stable key from the normalized query, its variables and the token scope"""
+    raw = json.dumps(
+        [normalize_query(query), variables or {}, scope],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return f"{op}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+class SQLiteBackend:
+    """Size-bounded LRU store in a single SQLite file (unbounded with ``max_bytes=None``)"""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, table: str = "entries"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.table = table
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def set(self, key: str, payload: bytes):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently used rows until we are back under 90% of the budget
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+
+
+class RedisBackend:
+    """Any Redis-protocol server; size bound and LRU come from its maxmemory policy
+
+    ``expire=None`` writes keys without an expiry (for ``get_store()``).
+    """
+
+    def __init__(self, url: str, expire: int = max(TTLS.values()) * (STALE_FACTOR + 1), prefix: str = "openmatch:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("the redis cache backend needs `pip install redis`") from e
+        self._redis = redis.Redis.from_url(url)
+        self.expire = expire
+        self.prefix = prefix
+
+    def get(self, key: str):
+        return self._redis.get(self.prefix + key)
+
+    def set(self, key: str, payload: bytes):
+        self._redis.set(self.prefix + key, payload, ex=self.expire)
+
+    def delete(self, key: str):
+        self._redis.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self._redis.scan_iter(match=self.prefix + "*"):
+            self._redis.delete(key)
+
+
+class ResponseCache:
+    """TTL + stale-while-revalidate front for a backend, with hit/miss counters"""
+
+    def __init__(self, backend, ttls: dict = None):
+        self.backend = backend
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def ttl(self, op: str) -> int:
+        return self.ttls.get(op, self.ttls["default"])
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def read(self, key: str):
+        """Return ``(value, age_seconds)`` or ``None``"""
+        try:
+            payload = self.backend.get(key)
+        except Exception:
+            self._count("errors")
+            return None
+        if payload is None:
+            return None
+        entry = json.loads(payload)
+        return entry["v"], time.time() - entry["t"]
+
+    def write(self, key: str, value):
+        payload = json.dumps({"v": value, "t": time.time()}, separators=(",", ":")).encode()
+        try:
+            self.backend.set(key, payload)
+        except Exception:
+            self._count("errors")
+
+    def delete(self, key: str):
+        self.backend.delete(key)
+
+    def fetch(self, key: str, op: str, loader):
+        """Serve ``key`` from cache when fresh (or stale-but-usable), else call ``loader()``"""
+        entry = self.read(key)
+        ttl = self.ttl(op)
+        if entry is not None:
+            value, age = entry
+            if age < ttl:
+                self._count("hits")
+                telemetry.cache_lookup(op, "hit")
+                return value
+            if age < ttl * STALE_FACTOR:
+                self._count("stale_hits")
+                telemetry.cache_lookup(op, "stale")
+                self._refresh_later(key, loader)
+                return value
+        self._count("misses")
+        telemetry.cache_lookup(op, "miss")
+        value = loader()
+        self.write(key, value)
+        return value
+
+    def _refresh_later(self, key: str, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.write(key, loader())
+                self._count("refreshes")
+            except Exception:
+                self._count("errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="openmatch-cache-refresh", daemon=True).start()
+
+
+def backend_from_url(url: str, durable: bool = False):
+    """Cache backend for ``url``; ``durable`` gives its never-evicted counterpart"""
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        if durable:
+            return RedisBackend(url, expire=None, prefix="openmatch-store:")
+        return RedisBackend(url)
+    if url.startswith("sqlite:///"):
+        if durable:
+            return SQLiteBackend(url[len("sqlite:///"):], max_bytes=None, table="stores")
+        max_bytes = int(os.environ.get("OPENMATCH_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        return SQLiteBackend(url[len("sqlite:///"):], max_bytes=max_bytes)
+    raise ValueError(f"Unsupported cache url: {url}")
+
+
+_cache = None
+_store = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Process-wide cache configured from ``OPENMATCH_CACHE_URL``"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(backend_from_url(os.environ.get("OPENMATCH_CACHE_URL", DEFAULT_URL)))
+    return _cache
+
+
+def get_store() -> ResponseCache:
+    """Process-wide durable store (same ``OPENMATCH_CACHE_URL``) for data that accumulates
+
+    Only ``read``/``write``/``delete`` are meant for it: nothing in it goes stale.
+    """
+    global _store
+    if _store is None:
+        with _cache_lock:
+            if _store is None:
+                _store = ResponseCache(backend_from_url(os.environ.get("OPENMATCH_CACHE_URL", DEFAULT_URL), durable=True))
+    return _store
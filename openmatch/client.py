@@ -0,0 +1,189 @@
+"""Pooled GitHub client shared by every page
+
+All GraphQL and REST traffic goes through one keep-alive ``requests.Session`` per
+worker process, so repeated calls reuse TCP/TLS connections instead of paying a
+fresh handshake each time, and every call carries a connect/read timeout.
+
+Identical read requests in flight at the same time (same normalized query,
+variables and token scope) are coalesced: one goes upstream, the rest share it.
+"""
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from openmatch import cache, ratelimit, resilience, telemetry
+from openmatch.singleflight import SingleFlight
+from openmatch.errors import GitHubError, RateLimitExceeded, TransientGitHubError
+
+log = logging.getLogger("openmatch.client")
+
+#  configuration (overridable from the environment)
+API_ROOT = os.environ.get("OPENMATCH_GITHUB_API", "https://api.github.com").rstrip("/")
+GRAPHQL_ENDPOINT = f"{API_ROOT}/graphql"
+CONNECT_TIMEOUT = float(os.environ.get("OPENMATCH_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("OPENMATCH_READ_TIMEOUT", "20"))
+POOL_SIZE = int(os.environ.get("OPENMATCH_POOL_SIZE", "20"))
+TRANSIENT_GRAPHQL_ERRORS = {"INTERNAL", "TIMEOUT", "SERVICE_UNAVAILABLE"}
+
+_session = None
+_session_lock = threading.Lock()
+_flights = SingleFlight()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session, creating it on first use"""
+    # Streamlit starts a new script thread on every rerun, so a thread-local
+    # session would be thrown away after each click; urllib3's pool is thread-safe
+    # and is shared by all of this worker's script threads instead.
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Accept-Encoding": "gzip",
+                    "User-Agent": "OpenMatch",
+                })
+                _session = session
+    return _session
+
+
+def default_timeout():
+    return (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _send(token: str, resource: str, method: str, url: str, call: telemetry.Call, **kwargs) -> requests.Response:
+    """Send one request through the rate-limit scheduler, waiting out a secondary limit once"""
+    key = (cache.token_scope(token), resource)
+    kwargs["timeout"] = kwargs.get("timeout") or default_timeout()
+    for attempt in range(2):
+        queued = time.perf_counter()
+        with ratelimit.scheduler.slot(key):
+            started = time.perf_counter()
+            response = get_session().request(method, url, **kwargs)
+            call.sent(response, started - queued, time.perf_counter() - started)
+        if not ratelimit.scheduler.record(key, response):
+            return response
+    raise RateLimitExceeded(ratelimit.scheduler.budget(key).blocked_until)
+
+
+def _graphql_once(token: str, query: str, variables: dict, timeout, op: str) -> dict:
+    call = telemetry.Call(op, "graphql", "POST")
+    try:
+        return _graphql_response(token, call, _send(
+            token, "graphql", "POST", GRAPHQL_ENDPOINT, call,
+            json={"query": query, "variables": variables or {}},
+            headers=auth_headers(token),
+            timeout=timeout,
+        ))
+    except Exception as e:
+        call.failed(e)
+        raise
+    finally:
+        telemetry.record(call)
+
+
+def _graphql_response(token: str, call: telemetry.Call, response: requests.Response) -> dict:
+    response.raise_for_status()
+    payload = response.json()
+    key = (cache.token_scope(token), "graphql")
+    errors = payload.get("errors") or []
+    data = payload.get("data")
+    if any(error.get("type") == "RATE_LIMITED" for error in errors):
+        ratelimit.scheduler.exhausted(key)
+        raise RateLimitExceeded(ratelimit.scheduler.budget(key).reset_at)
+    if (data or {}).get("rateLimit"):
+        call.cost = data["rateLimit"].get("cost")
+        ratelimit.scheduler.observe_graphql(key, data["rateLimit"])
+    if errors:
+        if any(_is_transient_error(error) for error in errors):
+            raise TransientGitHubError(errors)
+        if not data:
+            raise GitHubError(errors)
+        # partial result: GitHub nulls the failing fields (e.g. a deleted repo) and answers the rest
+        log.warning("partial GraphQL result: %s", GitHubError(errors))
+    return data
+
+
+def _is_transient_error(error: dict) -> bool:
+    return (
+        error.get("type") in TRANSIENT_GRAPHQL_ERRORS
+        or error.get("message", "").startswith("Something went wrong")
+    )
+
+
+def graphql(token: str, query: str, variables: dict = None, timeout=None, op: str = "graphql") -> dict:
+    """Run a GraphQL query with variables and return its ``data`` payload
+
+    Queries are retried on transient failures; mutations are sent exactly once.
+    ``op`` names the operation for telemetry and latency tracking (and hedging).
+    """
+    idempotent = not query.lstrip().startswith("mutation")
+
+    def call():
+        return resilience.call(
+            lambda: _graphql_once(token, query, variables, timeout, op),
+            endpoint="graphql", op=op, idempotent=idempotent,
+        )
+
+    if not idempotent:
+        return call()
+    return _flights.do(cache.make_key("graphql", query, variables, cache.token_scope(token)), call)
+
+
+def cached_graphql(token: str, op: str, query: str, variables: dict = None, shared: bool = False) -> dict:
+    """``graphql()`` behind the persistent response cache; ``op`` picks the TTL
+
+    ``shared`` entries are keyed without the token, for answers that are the
+    same whoever asks (e.g. searches restricted to ``is:public``).
+    """
+    scope = cache.PUBLIC_SCOPE if shared else cache.token_scope(token)
+    key = cache.make_key(op, query, variables, scope)
+    # coalesce on the cache key too, so shared entries are filled once across tokens;
+    # a shared call that fails (bad or exhausted token) is retried with each follower's own token
+    retry_key = (key, cache.token_scope(token)) if shared else None
+    return _flights.do(
+        key, lambda: cache.get_cache().fetch(key, op, lambda: graphql(token, query, variables, op=op)), retry_key=retry_key
+    )
+
+
+def rest_get(token: str, path: str, params: dict = None, headers: dict = None, timeout=None, op: str = None) -> requests.Response:
+    """GET a REST v3 resource, e.g. ``rest_get(token, "/users/octocat/events")``"""
+    request_headers = auth_headers(token)
+    request_headers["Accept"] = "application/vnd.github+json"
+    request_headers.update(headers or {})
+
+    def send():
+        call = telemetry.Call(op or "rest", "core")
+        try:
+            response = _send(
+                token, "core", "GET", f"{API_ROOT}{path}", call,
+                params=params,
+                headers=request_headers,
+                timeout=timeout,
+            )
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except Exception as e:
+            call.failed(e)
+            raise
+        finally:
+            telemetry.record(call)
+
+    key = ("rest", cache.token_scope(token), path, sorted((params or {}).items()), sorted((headers or {}).items()))
+    # the response is only read by callers, so followers share the same object
+    return _flights.do(
+        repr(key), lambda: resilience.call(send, endpoint="core", op=op or path), share=lambda response: response
+    )
@@ -0,0 +1,250 @@
+"""Streaming ingestion of a repository's full commit history to local Parquet
+
+``sync`` pages through the default branch's history with cursors (newest
+first) and appends every ``PART_ROWS`` commits as a Parquet part file under
+``COMMITS_DIR/<token scope>/<owner>/<repo>/``, next to a ``state.json`` that
+records how far it got.  Memory stays bounded however long the history is, and
+an interrupted first crawl resumes from its last cursor.  ``load`` reads the
+parts back as one DataFrame, oldest commit first.
+
+Later syncs walk the history newest first and store the commits not seen yet
+(by oid).  They can't ask for ``since`` the newest stored date: a merged pull
+request brings in commits with older committer dates, which would fall before
+it, and can sit below pages that are already stored.  So the first page also
+asks for the history's ``totalCount``: a sync stops at the first page that is
+entirely stored once it has found as many new commits as the store was short
+of that count, which is right away when nothing older was merged.  Each sync
+writes its new commits as one small part; once more than ``MAX_SMALL_PARTS``
+of those pile up, the parts are rewritten as full ones.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from openmatch import cache, client
+
+COMMITS_DIR = os.environ.get("OPENMATCH_COMMITS_DIR", ".openmatch/commits")
+PAGE_SIZE = 100
+PART_ROWS = 5000
+REFRESH_INTERVAL = 5 * 60
+#  parts beyond what the stored rows fill at PART_ROWS each, before they are compacted
+MAX_SMALL_PARTS = 16
+COLUMNS = [
+    "oid", "committed_date", "message", "author_name", "author_email", "author_login",
+    "additions", "deletions", "changed_files",
+]
+
+HISTORY_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $after) {
+            totalCount
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
+            nodes {
+              oid
+              message
+              committedDate
+              additions
+              deletions
+              changedFilesIfAvailable
+              author {
+                name
+                email
+                user {
+                  login
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+#  one ingester per repository directory at a time
+_locks = defaultdict(threading.Lock)
+_locks_guard = threading.Lock()
+
+
+def repo_dir(token: str, owner: str, name: str) -> str:
+    return os.path.join(COMMITS_DIR, cache.token_scope(token), owner.lower(), name.lower())
+
+
+def _read_state(path: str) -> dict:
+    try:
+        with open(os.path.join(path, "state.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"parts": 0, "complete": False, "cursor": None, "newest": None, "synced_at": 0}
+
+
+def _write_state(path: str, state: dict):
+    tmp = os.path.join(path, "state.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(path, "state.json"))
+
+
+def _row(node: dict) -> dict:
+    author = node.get("author") or {}
+    return {
+        "oid": node["oid"],
+        "committed_date": node["committedDate"],
+        "message": node.get("message") or "",
+        "author_name": author.get("name"),
+        "author_email": author.get("email"),
+        "author_login": (author.get("user") or {}).get("login"),
+        "additions": node.get("additions"),
+        "deletions": node.get("deletions"),
+        "changed_files": node.get("changedFilesIfAvailable"),
+    }
+
+
+def _part_files(path: str) -> list:
+    return sorted(f for f in os.listdir(path) if f.endswith(".parquet")) if os.path.isdir(path) else []
+
+
+def _write_part(path: str, state: dict, rows: list):
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    frame["committed_date"] = pd.to_datetime(frame["committed_date"], utc=True)
+    for column in ("additions", "deletions", "changed_files"):
+        frame[column] = frame[column].astype("Int64")
+    _write_frame(path, state, frame)
+
+
+def _write_frame(path: str, state: dict, frame: pd.DataFrame):
+    part = os.path.join(path, f"part-{state['parts']:05d}.parquet")
+    frame.to_parquet(part + ".tmp", index=False)
+    os.replace(part + ".tmp", part)
+    state["parts"] += 1
+
+
+def _pages(token: str, owner: str, name: str, after: str = None):
+    """Yield ``(nodes, end cursor, has next page, total count)`` for each page of history"""
+    while True:
+        data = client.graphql(
+            token,
+            HISTORY_QUERY,
+            {"owner": owner, "name": name, "first": PAGE_SIZE, "after": after},
+            op="commit_history",
+        )
+        repository = data.get("repository")
+        if not repository:
+            raise ValueError(f"Repository '{owner}/{name}' not found")
+        if not repository["defaultBranchRef"]:
+            return   # empty repository
+        history = repository["defaultBranchRef"]["target"]["history"]
+        yield history["nodes"], history["pageInfo"]["endCursor"], history["pageInfo"]["hasNextPage"], history["totalCount"]
+        if not history["pageInfo"]["hasNextPage"]:
+            return
+        after = history["pageInfo"]["endCursor"]
+
+
+def _ingest_full(token: str, owner: str, name: str, path: str, state: dict):
+    buffered = []
+    for nodes, cursor, more, _ in _pages(token, owner, name, after=state["cursor"]):
+        if state["newest"] is None and nodes:
+            state["newest"] = nodes[0]["committedDate"]
+        buffered += [_row(node) for node in nodes]
+        if len(buffered) >= PART_ROWS or not more:
+            if buffered:
+                _write_part(path, state, buffered)
+            buffered = []
+            # a crash from here on resumes after what was just written
+            state["cursor"] = cursor
+            _write_state(path, state)
+    state["complete"] = True
+    state["cursor"] = None
+
+
+def _stored_oids(path: str) -> set:
+    return {oid for part in _part_files(path) for oid in pd.read_parquet(os.path.join(path, part), columns=["oid"])["oid"]}
+
+
+def _ingest_new(token: str, owner: str, name: str, path: str, state: dict) -> int:
+    """Store the commits not stored yet; returns how many commits are stored"""
+    known = _stored_oids(path)
+    rows = []
+    found = 0
+    missing = None
+    for nodes, _, _, total in _pages(token, owner, name):
+        if missing is None:
+            missing = total - len(known)
+        fresh = [node for node in nodes if node["oid"] not in known]
+        found += len(fresh)
+        rows += [_row(node) for node in fresh]
+        if len(rows) >= PART_ROWS:
+            _write_part(path, state, rows)
+            rows = []
+        # past a page that is all stored only while the count says older commits are still missing
+        if not fresh and found >= missing:
+            break
+    if rows:
+        _write_part(path, state, rows)
+    return len(known) + found
+
+
+def _compact(path: str, state: dict):
+    """Rewrite every part as parts of ``PART_ROWS`` commits, dropping the small ones"""
+    old = _part_files(path)
+    frame = pd.concat([pd.read_parquet(os.path.join(path, part)) for part in old], ignore_index=True)
+    frame = frame.drop_duplicates("oid").sort_values("committed_date", ascending=False, kind="stable", ignore_index=True)
+    for start in range(0, len(frame), PART_ROWS):
+        _write_frame(path, state, frame.iloc[start:start + PART_ROWS])
+    # the new parts hold every commit, so load() is right whether or not the old ones are gone yet
+    _write_state(path, state)
+    for part in old:
+        os.remove(os.path.join(path, part))
+
+
+def sync(token: str, owner: str, name: str, force: bool = False) -> dict:
+    """Bring the local store of ``owner/name`` up to date; returns its state"""
+    path = repo_dir(token, owner, name)
+    with _locks_guard:
+        lock = _locks[path]
+    with lock:
+        os.makedirs(path, exist_ok=True)
+        state = _read_state(path)
+        if not force and state["complete"] and time.time() - state["synced_at"] < REFRESH_INTERVAL:
+            return state
+        if not state["complete"] or not state["newest"]:
+            _ingest_full(token, owner, name, path, state)
+        else:
+            stored = _ingest_new(token, owner, name, path, state)
+            if len(_part_files(path)) > math.ceil(stored / PART_ROWS) + MAX_SMALL_PARTS:
+                _compact(path, state)
+        state["synced_at"] = time.time()
+        _write_state(path, state)
+        return state
+
+
+def load(token: str, owner: str, name: str, columns: list = None) -> pd.DataFrame:
+    """Every stored commit of ``owner/name``, oldest first"""
+    path = repo_dir(token, owner, name)
+    parts = _part_files(path)
+    if not parts:
+        return pd.DataFrame(columns=columns or COLUMNS)
+    wanted = list(dict.fromkeys((columns or COLUMNS) + ["oid", "committed_date"]))
+    frame = pd.concat(
+        [pd.read_parquet(os.path.join(path, part), columns=wanted) for part in parts], ignore_index=True
+    )
+    frame = frame.drop_duplicates("oid").sort_values("committed_date", kind="stable", ignore_index=True)
+    return frame[columns] if columns else frame
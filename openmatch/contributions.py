@@ -0,0 +1,215 @@
+"""Per-user store of daily contribution counts, back to the account's creation
+
+GitHub's ``contributionsCollection(from:, to:)`` rejects ranges longer than a
+year, so any requested window is split into yearly chunks that are fetched at
+the same time.  Counts are kept per (token scope, user) in the durable store
+(``cache.get_store()``) along with the contiguous range they cover; a later
+request only asks GitHub for days outside that range, plus the last few days
+(which still change) at most every ``REFRESH_INTERVAL`` seconds.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from openmatch import cache, client, ratelimit
+
+CHUNK_DAYS = 365
+CHUNK_WORKERS = int(os.environ.get("OPENMATCH_CALENDAR_WORKERS", "4"))
+REFRESH_INTERVAL = 5 * 60
+#  days this close to today may still gain contributions (time zones, late pushes)
+SETTLE_DAYS = 2
+
+CALENDAR_QUERY = """
+query($login: String!, $from: DateTime!, $to: DateTime!) {
+  user(login: $login) {
+    contributionsCollection(from: $from, to: $to) {
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+CREATED_AT_QUERY = """
+query($login: String!) {
+  user(login: $login) {
+    createdAt
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+# separate from the dashboard pool: dashboard jobs call in here and wait on the chunks
+_pool = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="openmatch-calendar")
+_lock = threading.Lock()
+
+
+def _store_key(token: str, login: str) -> str:
+    return f"contributions:{cache.token_scope(token)}:{login.lower()}"
+
+
+def _empty_store() -> dict:
+    return {"days": {}, "covered_from": None, "fetched_through": None, "settled_through": None, "synced_at": 0}
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def chunks(start: date, end: date, size: int = CHUNK_DAYS) -> list:
+    """Split ``[start, end]`` into consecutive ranges of at most ``size`` days"""
+    ranges = []
+    while start <= end:
+        stop = min(end, start + timedelta(days=size - 1))
+        ranges.append((start, stop))
+        start = stop + timedelta(days=1)
+    return ranges
+
+
+def _fetch_chunk(token: str, login: str, start: date, end: date) -> dict:
+    data = client.graphql(
+        token,
+        CALENDAR_QUERY,
+        {"login": login, "from": f"{start.isoformat()}T00:00:00Z", "to": f"{end.isoformat()}T23:59:59Z"},
+        op="contribution_calendar",
+    )
+    if not data.get("user"):
+        raise ValueError(f"GitHub user '{login}' not found")
+    weeks = data["user"]["contributionsCollection"]["contributionCalendar"]["weeks"]
+    return {
+        day["date"]: day["contributionCount"]
+        for week in weeks
+        for day in week["contributionDays"]
+        if start.isoformat() <= day["date"] <= end.isoformat()
+    }
+
+
+def _fetch_ranges(token: str, login: str, ranges: list) -> dict:
+    """Fetch every range in yearly chunks, all at once"""
+    session = ratelimit.current_session_id()
+
+    def run(start, end):
+        with ratelimit.session_scope(session):
+            return _fetch_chunk(token, login, start, end)
+
+    futures = [_pool.submit(run, *chunk) for start, end in ranges for chunk in chunks(start, end)]
+    days = {}
+    for future in futures:
+        days.update(future.result())
+    return days
+
+
+def created_at(token: str, login: str) -> date:
+    data = client.cached_graphql(token, "user_created_at", CREATED_AT_QUERY, {"login": login})
+    if not data.get("user"):
+        raise ValueError(f"GitHub user '{login}' not found")
+    return date.fromisoformat(data["user"]["createdAt"][:10])
+
+
+def _missing(store: dict, start: date, end: date, now: float):
+    """``(head, tail)`` ranges to fetch so the store answers ``[start, end]``
+
+    Both extend the covered range without leaving gaps; either may be None.
+    """
+    if store["covered_from"] is None:
+        return None, (start, end)
+    covered_from = date.fromisoformat(store["covered_from"])
+    fetched_through = date.fromisoformat(store["fetched_through"])
+    settled_through = date.fromisoformat(store["settled_through"])
+    head = tail = None
+    if start < covered_from:
+        head = (start, covered_from - timedelta(days=1))
+    if end > settled_through and (end > fetched_through or now - store["synced_at"] >= REFRESH_INTERVAL):
+        tail = (settled_through + timedelta(days=1), end)
+    return head, tail
+
+
+def revision(token: str, login: str) -> tuple:
+    """Changes whenever the stored counts for ``login`` do"""
+    entry = cache.get_store().read(_store_key(token, login))
+    store = entry[0] if entry else _empty_store()
+    return _store_key(token, login), store["covered_from"], store["fetched_through"], store["synced_at"]
+
+
+def seed(token: str, login: str, days: list):
+    """Start an empty store from ``[(date, count), ...]`` we already hold (the snapshot's calendar)
+
+    The unsettled tail is still refetched on the next ``daily_counts``.
+    """
+    if not days:
+        return
+    store_cache = cache.get_store()
+    key = _store_key(token, login)
+    with _lock:
+        if store_cache.read(key):
+            return
+        first, last = days[0][0], days[-1][0]
+        settled = min(last, _utc_today() - timedelta(days=SETTLE_DAYS))
+        store_cache.write(key, dict(
+            _empty_store(),
+            days={day.isoformat(): count for day, count in days},
+            covered_from=first.isoformat(),
+            fetched_through=last.isoformat(),
+            settled_through=settled.isoformat(),
+        ))
+
+
+def daily_counts(token: str, login: str, start: date = None, end: date = None, since: date = None) -> list:
+    """``[(date, count), ...]`` for every day in ``[start, end]``
+
+    ``start`` defaults to (and is clamped to) the account's creation date
+    ``since``; pass it when already known (e.g. from the user snapshot) to save
+    a request.  ``end`` defaults to today (UTC).
+    """
+    since = since or created_at(token, login)
+    today = _utc_today()
+    start = max(start or since, since)
+    end = min(end or today, today)
+    if start > end:
+        return []
+
+    store_cache = cache.get_store()
+    key = _store_key(token, login)
+    entry = store_cache.read(key)
+    store = entry[0] if entry else _empty_store()
+    now = time.time()
+
+    head, tail = _missing(store, start, end, now)
+    if head or tail:
+        fetched = _fetch_ranges(token, login, [r for r in (head, tail) if r])
+        with _lock:
+            # another session may have extended the store meanwhile
+            entry = store_cache.read(key)
+            store = entry[0] if entry else _empty_store()
+            fetched_from = (head or tail)[0]
+            covered_from = min(fetched_from.isoformat(), store["covered_from"] or fetched_from.isoformat())
+            store = dict(store, days=dict(store["days"], **fetched), covered_from=covered_from)
+            if tail:
+                settled = min(end, today - timedelta(days=SETTLE_DAYS)).isoformat()
+                store["fetched_through"] = max(end.isoformat(), store["fetched_through"] or "")
+                store["settled_through"] = max(settled, store["settled_through"] or "")
+                store["synced_at"] = now
+            store_cache.write(key, store)
+
+    days = store["days"]
+    return [
+        (start + timedelta(days=offset), days.get((start + timedelta(days=offset)).isoformat(), 0))
+        for offset in range((end - start).days + 1)
+    ]
@@ -0,0 +1,54 @@
+"""Concurrent loading of independent dashboard sections
+
+Fetches run on a small process-wide thread pool so one rerun waits for its
+slowest request rather than the sum of all of them, while the total number of
+concurrent upstream calls per worker stays bounded.  Jobs must not touch
+Streamlit; the caller renders each result on the script thread as it arrives.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from openmatch import ratelimit
+
+MAX_WORKERS = int(os.environ.get("OPENMATCH_FETCH_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="openmatch-fetch")
+
+
+def _run_as(session, job, args, kwargs):
+    with ratelimit.session_scope(session):
+        return job(*args, **kwargs)
+
+
+def submit(job, *args, **kwargs):
+    """Run ``job`` on the pool, billed to the calling session by the rate-limit scheduler"""
+    return _executor.submit(_run_as, ratelimit.current_session_id(), job, args, kwargs)
+
+
+class FanOut:
+    """Jobs started at once, yielded as ``(name, result, error)`` as each finishes
+
+    ``add()`` may be called while iterating, to start follow-up jobs that
+    need a result that just arrived; iteration ends when every job is done.
+    """
+
+    def __init__(self, jobs: dict = None):
+        self._futures = {}
+        self.add(jobs or {})
+
+    def add(self, jobs: dict):
+        for name, job in jobs.items():
+            self._futures[submit(job)] = name
+
+    def __iter__(self):
+        while self._futures:
+            done, _ = wait(list(self._futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = self._futures.pop(future)
+                error = future.exception()
+                yield name, (None if error else future.result()), error
+
+
+def fan_out(jobs: dict):
+    """Start every ``{name: callable}`` at once and yield ``(name, result, error)`` as each finishes"""
+    return iter(FanOut(jobs))
@@ -0,0 +1,34 @@
+"""Exceptions raised by the shared GitHub access layer"""
+import time
+
+
+class GitHubError(Exception):
+    """GitHub answered, but the GraphQL payload carried errors instead of data"""
+
+    def __init__(self, errors):
+        self.errors = errors or []
+        messages = [e.get("message", str(e)) if isinstance(e, dict) else str(e) for e in self.errors]
+        super().__init__("; ".join(messages) or "GitHub returned an error")
+
+
+class RateLimitExceeded(Exception):
+    """The token's GitHub budget is spent (or paused) for longer than we are willing to wait"""
+
+    def __init__(self, reset_at: float = None):
+        self.reset_at = reset_at
+        when = time.strftime("%H:%M:%S UTC", time.gmtime(reset_at)) if reset_at else "later"
+        super().__init__(f"GitHub rate limit reached for this token, try again at {when}")
+
+
+class TransientGitHubError(GitHubError):
+    """GraphQL errors that usually go away on retry (timeouts, "Something went wrong")"""
+
+
+class CircuitOpenError(Exception):
+    """Calls to a GitHub endpoint are paused after repeated failures"""
+
+    def __init__(self, endpoint: str, retry_at: float):
+        self.endpoint = endpoint
+        self.retry_at = retry_at
+        seconds = max(int(retry_at - time.time()), 1)
+        super().__init__(f"GitHub {endpoint} API is failing, requests paused for {seconds}s")
@@ -0,0 +1,87 @@
+"""Incremental collector of a user's public events, for activity patterns
+
+GitHub's events API only serves the last 300 events (and at most 90 days), 100
+per page.  ``sync`` asks for the first page with the stored ``ETag`` in
+``If-None-Match``: an unchanged feed answers 304, which costs no rate limit.
+Otherwise it keeps paging only until it reaches an event it already has, and
+merges the new ones into a per-user store (``cache.get_store()``, which never
+expires or evicts), so weekday and hour-of-day patterns keep building up beyond
+the API's window.
+"""
+import threading
+import time
+
+import numpy as np
+
+from openmatch import cache, client
+
+PER_PAGE = 100
+MAX_PAGES = 3              # 300 events is all the API will ever return
+MAX_STORED = 20000
+DEFAULT_POLL_INTERVAL = 60  # GitHub's X-Poll-Interval when it sends none
+
+_lock = threading.Lock()
+
+
+def _store_key(token: str, login: str) -> str:
+    return f"events:{cache.token_scope(token)}:{login.lower()}"
+
+
+def _empty_store() -> dict:
+    return {"events": {}, "etag": None, "polled_at": 0, "poll_interval": DEFAULT_POLL_INTERVAL}
+
+
+def _fetch_new(token: str, login: str, store: dict):
+    """New events (id -> [created_at, type]) plus the first page's ETag and poll interval"""
+    new = {}
+    etag, poll_interval = store["etag"], store["poll_interval"]
+    for page in range(1, MAX_PAGES + 1):
+        headers = {"If-None-Match": etag} if page == 1 and etag else None
+        response = client.rest_get(
+            token, f"/users/{login}/events", params={"per_page": PER_PAGE, "page": page},
+            headers=headers, op="user_events",
+        )
+        if response.status_code == 304:
+            break
+        if page == 1:
+            etag = response.headers.get("ETag")
+            poll_interval = int(response.headers.get("X-Poll-Interval", DEFAULT_POLL_INTERVAL))
+        events = response.json()
+        fresh = [event for event in events if event["id"] not in store["events"]]
+        new.update((event["id"], [event["created_at"], event["type"]]) for event in fresh)
+        # newest first: once a page holds something we already have, the rest is stored too
+        if len(fresh) < len(events) or len(events) < PER_PAGE:
+            break
+    return new, etag, poll_interval
+
+
+def sync(token: str, login: str, force: bool = False) -> dict:
+    """Merge events published since the last sync into the user's store and return it"""
+    store_cache = cache.get_store()
+    key = _store_key(token, login)
+    entry = store_cache.read(key)
+    store = entry[0] if entry else _empty_store()
+    if not force and time.time() - store["polled_at"] < store["poll_interval"]:
+        return store
+
+    new, etag, poll_interval = _fetch_new(token, login, store)
+    with _lock:
+        entry = store_cache.read(key)
+        store = entry[0] if entry else _empty_store()
+        merged = dict(store["events"], **new)
+        if len(merged) > MAX_STORED:
+            newest = sorted(merged.items(), key=lambda item: item[1][0])[-MAX_STORED:]
+            merged = dict(newest)
+        store = {"events": merged, "etag": etag, "polled_at": time.time(), "poll_interval": poll_interval}
+        store_cache.write(key, store)
+    return store
+
+
+def patterns(store: dict):
+    """Event counts per weekday (Monday first) and per hour of the day (UTC)"""
+    stamps = np.array([created_at[:19] for created_at, _ in store["events"].values()], dtype="datetime64[s]")
+    days = stamps.astype("datetime64[D]")
+    # 1970-01-01 was a Thursday, so Monday = 0
+    weekdays = (days.astype(np.int64) + 3) % 7
+    hours = (stamps - days).astype("timedelta64[h]").astype(np.int64)
+    return np.bincount(weekdays, minlength=7), np.bincount(hours, minlength=24)
@@ -0,0 +1,73 @@
+"""Cold-start and per-navigation import time of the app's pages
+
+    python -m openmatch.importtime [--runs 5] [--top 10]
+
+Every measurement runs in a fresh interpreter, so nothing is imported yet.
+"cold start" is what a new replica pays before the first render: Streamlit
+plus the landing page.  Each page row is what the first visit to that page
+adds on top of it (later visits import nothing).  ``--top`` lists the modules
+that page pulls in with the largest own import time, from ``-X importtime``.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+#  what app.py's registry imports, in the order a visitor meets them
+STARTUP_MODULES = ["streamlit", "landing_page"]
+PAGE_MODULES = ["pages.opensource_projects", "pages.show_stats_page"]
+
+_CHILD = """
+import importlib, json, sys, time
+preload, target = sys.argv[1].split(",") if sys.argv[1] else [], sys.argv[2]
+started = time.perf_counter()
+for name in preload:
+    importlib.import_module(name)
+before = set(sys.modules)
+loaded = time.perf_counter()
+importlib.import_module(target)
+done = time.perf_counter()
+print(json.dumps({"preload": loaded - started, "target": done - loaded, "new": sorted(set(sys.modules) - before)}))
+"""
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(.+)")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(preload: list, target: str, importtime: bool = False) -> dict:
+    """Import ``preload`` then ``target`` in a new interpreter; seconds for each, plus new modules"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _CHILD, ",".join(preload), target]
+    result = subprocess.run(command, cwd=_ROOT, capture_output=True, text=True, check=True)
+    timing = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        new = set(timing["new"])
+        timing["modules"] = sorted(
+            ((int(m.group(1)) / 1e6, m.group(3).strip()) for m in map(_IMPORTTIME_LINE.match, result.stderr.splitlines())
+             if m and m.group(3).strip() in new),
+            reverse=True,
+        )
+    return timing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start and per-page import time")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per row (median reported)")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules each page imports")
+    args = parser.parse_args()
+
+    def row(label: str, seconds: list):
+        print(f"{label:<48} {statistics.median(seconds) * 1000:8.0f} ms")
+
+    startup = [measure(STARTUP_MODULES[:-1], STARTUP_MODULES[-1]) for _ in range(args.runs)]
+    row("cold start (" + " + ".join(STARTUP_MODULES) + ")", [t["preload"] + t["target"] for t in startup])
+    for page in PAGE_MODULES:
+        row(f"first visit: {page}", [measure(STARTUP_MODULES, page)["target"] for _ in range(args.runs)])
+        if args.top:
+            for seconds, module in measure(STARTUP_MODULES, page, importtime=True)["modules"][:args.top]:
+                print(f"    {module:<44} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Incremental language profile of a GitHub user
+
+The profile stores, per repository, its ``pushedAt`` and the byte size of every
+language in it.  A full sync pages through all repositories with cursors; later
+refreshes walk repositories newest-push-first and stop at the first one that has
+not been pushed since the previous sync, so an unchanged user costs one small
+request.  Languages are weighted by bytes (``languages.edges.size``), not by the
+number of repositories they appear in.
+"""
+import time
+from collections import Counter
+
+from openmatch import cache, client
+
+REFRESH_INTERVAL = 15 * 60       # serve the stored profile without asking GitHub
+FULL_SYNC_INTERVAL = 24 * 3600   # rebuild from scratch so deleted repos drop out
+FULL_PAGE_SIZE = 100
+INCREMENTAL_PAGE_SIZE = 10
+
+REPOSITORIES_QUERY = """
+query($login: String!, $first: Int!, $after: String) {
+  user(login: $login) {
+    repositories(first: $first, after: $after, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        nameWithOwner
+        pushedAt
+        languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+          edges {
+            size
+            node {
+              name
+            }
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+
+def _profile_key(token: str, login: str) -> str:
+    return f"language_profile:{cache.token_scope(token)}:{login.lower()}"
+
+
+def _empty_profile() -> dict:
+    return {"repos": {}, "watermark": "", "synced_at": 0, "full_synced_at": 0}
+
+
+def _repo_entry(node: dict) -> dict:
+    return {
+        "pushedAt": node.get("pushedAt") or "",
+        "languages": {edge["node"]["name"]: edge["size"] for edge in node["languages"]["edges"]},
+    }
+
+
+def _walk(token: str, login: str, page_size: int, first_page: dict = None):
+    """Yield repository nodes, newest push first, one page per request"""
+    after = None
+    if first_page is not None:
+        # a page we already hold (e.g. from the user snapshot) costs nothing
+        yield from first_page["nodes"]
+        if not first_page["pageInfo"]["hasNextPage"]:
+            return
+        after = first_page["pageInfo"]["endCursor"]
+    while True:
+        data = client.graphql(
+            token, REPOSITORIES_QUERY, {"login": login, "first": page_size, "after": after}, op="language_profile"
+        )
+        repositories = (data.get("user") or {}).get("repositories")
+        if not repositories:
+            return
+        yield from repositories["nodes"]
+        if not repositories["pageInfo"]["hasNextPage"]:
+            return
+        after = repositories["pageInfo"]["endCursor"]
+
+
+def sync_profile(token: str, login: str, force: bool = False, first_page: dict = None) -> dict:
+    """Return the user's language profile, fetching only what changed since last time
+
+    ``first_page`` is an already-fetched ``repositories`` connection ordered by
+    ``PUSHED_AT`` (with ``languages.edges``); the walk starts from it.
+    """
+    store = cache.get_store()
+    key = _profile_key(token, login)
+    entry = store.read(key)
+    profile = entry[0] if entry else _empty_profile()
+    now = time.time()
+
+    if not force and now - profile["synced_at"] < REFRESH_INTERVAL:
+        return profile
+
+    full = force or now - profile["full_synced_at"] >= FULL_SYNC_INTERVAL
+    if full:
+        repos = {}
+        for node in _walk(token, login, FULL_PAGE_SIZE, first_page):
+            repos[node["nameWithOwner"]] = _repo_entry(node)
+        profile = {"repos": repos, "synced_at": now, "full_synced_at": now}
+    else:
+        repos = dict(profile["repos"])
+        for node in _walk(token, login, INCREMENTAL_PAGE_SIZE, first_page):
+            # ordered by pushedAt, so everything from here on is already stored
+            if (node.get("pushedAt") or "") <= profile["watermark"]:
+                break
+            repos[node["nameWithOwner"]] = _repo_entry(node)
+        profile = dict(profile, repos=repos, synced_at=now)
+
+    profile["watermark"] = max((repo["pushedAt"] for repo in profile["repos"].values()), default="")
+    store.write(key, profile)
+    return profile
+
+
+def language_bytes(profile: dict) -> Counter:
+    """Total bytes per language across all repositories"""
+    totals = Counter()
+    for repo in profile["repos"].values():
+        totals.update(repo["languages"])
+    return totals
+
+
+def top_languages(profile: dict, n: int = 5) -> list:
+    """``[(language, bytes), ...]`` for the ``n`` heaviest languages"""
+    return language_bytes(profile).most_common(n)
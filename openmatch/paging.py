@@ -0,0 +1,62 @@
+"""Result lists that grow one page at a time
+
+A ``Pager`` keeps every page fetched so far (pages store it in
+``st.session_state``), so showing more or fewer results than before only
+requests pages that were never fetched, starting from the last ``endCursor``.
+``merged`` builds one pager over several sources (e.g. one search per
+language) whose next pages are fetched concurrently.
+"""
+import functools
+
+from openmatch import dashboard
+
+
+class Pager:
+    def __init__(self, fetch_page):
+        """``fetch_page(after)`` returns ``(items, next_after, has_next_page)``
+
+        ``after`` is None for the first page, then whatever the previous call
+        returned: a GraphQL ``endCursor`` or, for local queries, an offset.
+        """
+        self.fetch_page = fetch_page
+        self.items = []
+        self.after = None
+        self.exhausted = False
+        self.pages = 0
+
+    def ensure(self, count: int) -> list:
+        """The first ``count`` items, fetching only the pages still missing"""
+        while len(self.items) < count and not self.exhausted:
+            items, self.after, has_next = self.fetch_page(self.after)
+            self.items.extend(items)
+            self.pages += 1
+            self.exhausted = not has_next or not items
+        return self.items[:count]
+
+    def has_more(self, count: int) -> bool:
+        return len(self.items) > count or not self.exhausted
+
+
+def merged(fetchers: dict, merge) -> Pager:
+    """One pager over several paginated sources, fetched concurrently
+
+    ``fetchers`` maps a source name to its own ``fetch_page``.  Each page of the
+    merged pager fetches the next page of every source not yet exhausted and
+    ``merge({name: items})`` combines them (dedupe, interleave, rank...).
+    """
+    def fetch_page(after):
+        # per-source cursors; exhausted sources drop out
+        cursors = dict(after) if after is not None else {name: None for name in fetchers}
+        jobs = {name: functools.partial(fetchers[name], cursor) for name, cursor in cursors.items()}
+        pages = {}
+        for name, result, error in dashboard.fan_out(jobs):
+            if error is not None:
+                raise error
+            items, cursors[name], has_next = result
+            pages[name] = items
+            if not has_next or not items:
+                del cursors[name]
+        # keep the caller's source order, whatever order the pages arrived in
+        return merge({name: pages[name] for name in fetchers if name in pages}), cursors, bool(cursors)
+
+    return Pager(fetch_page)
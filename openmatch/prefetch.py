@@ -0,0 +1,105 @@
+"""Background cache warm-up as soon as credentials are entered
+
+``warm(token, login)`` is called on every rerun of both pages.  The first call
+for a session starts a job on a small pool that fills, in order, the caches
+the buttons read from: the user snapshot (profile, calendar, PRs, repository
+list), the language profile, the last year of the contribution store, the
+events store and the default per-language project searches.  Later calls with
+the same credentials are no-ops; new credentials cancel the running warm-up
+(between steps; a request already in flight still lands in the cache) and
+start another.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from openmatch import contributions, events, languages, ratelimit, search, snapshot
+
+log = logging.getLogger("openmatch.prefetch")
+
+ENABLED = os.environ.get("OPENMATCH_PREFETCH", "1") == "1"
+WORKERS = int(os.environ.get("OPENMATCH_PREFETCH_WORKERS", "4"))
+REWARM_AFTER = 10 * 60   # the snapshot's TTL: after that a finished warm-up is redone
+TOP_LANGUAGES = 5
+MAX_TRACKED = 1000
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="openmatch-prefetch")
+_lock = threading.Lock()
+_warmups = OrderedDict()   # session -> Warmup, least recently touched first
+
+
+class Warmup:
+    def __init__(self, token: str, login: str):
+        self.credentials = (token, login)
+        self.cancelled = threading.Event()
+        self.started_at = time.time()
+        self.steps = []
+        self.future = None
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def stale(self) -> bool:
+        return self.future.done() and time.time() - self.started_at > REWARM_AFTER
+
+
+def _steps(token: str, login: str):
+    """Fill one cache per step, yielding its name; the most used come first"""
+    snap = snapshot.get_user_snapshot(token, login)
+    yield "snapshot"
+
+    profile = languages.sync_profile(token, login, first_page=snapshot.repositories(snap))
+    yield "languages"
+
+    contributions.seed(token, login, snapshot.contribution_days(snap))
+    since = date.fromisoformat(snapshot.user(snap)["createdAt"][:10])
+    contributions.daily_counts(token, login, start=date.today() - timedelta(days=364), since=since)
+    yield "contributions"
+
+    events.sync(token, login)
+    yield "events"
+
+    for lang, _ in languages.top_languages(profile, TOP_LANGUAGES):
+        search.repositories(token, [lang], search.DEFAULT_FILTERS, search.LANGUAGE_PAGE_SIZE)
+        yield f"search:{lang}"
+
+
+def _run(warmup: Warmup, session: str):
+    token, login = warmup.credentials
+    with ratelimit.session_scope(session):
+        try:
+            for step in _steps(token, login):
+                warmup.steps.append(step)
+                if warmup.cancelled.is_set():
+                    log.debug("prefetch for %s cancelled after %s", login, step)
+                    return
+        except Exception as e:
+            # the button that needs this data will surface the error properly
+            log.info("prefetch for %s stopped: %s", login, e)
+
+
+def warm(token: str, login: str, session: str = None):
+    """Start (or keep) warming the caches for these credentials; returns the ``Warmup``"""
+    session = session or ratelimit.current_session_id()
+    with _lock:
+        current = _warmups.get(session)
+        if current is not None:
+            if current.credentials == (token, login) and not current.cancelled.is_set() and not current.stale():
+                _warmups.move_to_end(session)
+                return current
+            current.cancel()
+            del _warmups[session]
+        if not ENABLED or not token or not login:
+            return None
+
+        warmup = _warmups[session] = Warmup(token, login)
+        while len(_warmups) > MAX_TRACKED:
+            _warmups.popitem(last=False)[1].cancel()
+        warmup.future = _pool.submit(_run, warmup, session)
+        return warmup
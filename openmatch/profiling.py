@@ -0,0 +1,296 @@
+"""Opt-in profiling of page reruns
+
+    OPENMATCH_PROFILE=1 streamlit run app.py
+    python -m openmatch.profiling [--dir .openmatch/profiles] [--slowest 10]
+
+With ``OPENMATCH_PROFILE=1`` every rerun that ``app.py`` routes is split into
+phases, timed on the script thread:
+
+* ``fetch``: waiting for data (GitHub, the response cache, the local stores);
+* ``transform``: building DataFrames and other derived data;
+* ``figure``: constructing plotly figures;
+* ``import``: importing the page module, on its first visit;
+* ``emit``: everything else, i.e. Streamlit element calls, card HTML and
+  serializing figures in ``st.plotly_chart``.
+
+Pages mark phases with ``phase()``, ``phased()`` and ``timed()``; nested
+phases count towards the innermost one.  Outside a profiled rerun (or on a
+worker thread) they cost one context-variable lookup.
+
+A stack sampler runs beside every profiled rerun.  Reruns slower than
+``OPENMATCH_PROFILE_SLOW_MS`` are appended to ``reruns.jsonl`` in
+``OPENMATCH_PROFILE_DIR`` with their sampled stacks (``.folded``, the input of
+flamegraph.pl and speedscope), so a slow rerun in production can be read
+without reproducing it.  A random ``OPENMATCH_PROFILE_SAMPLE`` share of reruns
+is also run under cProfile (``.prof``, for ``python -m pstats`` or snakeviz).
+"""
+import argparse
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from openmatch import ratelimit
+
+log = logging.getLogger("openmatch.profile")
+
+ENABLED = os.environ.get("OPENMATCH_PROFILE", "0") == "1"
+PROFILE_DIR = os.environ.get("OPENMATCH_PROFILE_DIR", os.path.join(".openmatch", "profiles"))
+SLOW_MS = float(os.environ.get("OPENMATCH_PROFILE_SLOW_MS", "1000"))
+SAMPLE_RATE = float(os.environ.get("OPENMATCH_PROFILE_SAMPLE", "0.02"))
+#  seconds between two stack samples
+STACK_INTERVAL = 0.01
+#  captures kept on disk (oldest removed first), and size at which reruns.jsonl is rotated
+MAX_CAPTURES = 200
+MAX_LOG_BYTES = 16 * 1024 * 1024
+PHASES = ("fetch", "transform", "figure", "import", "emit")
+ROOT_PHASE = "emit"
+
+_current = contextvars.ContextVar("openmatch_rerun", default=None)
+_write_lock = threading.Lock()
+
+
+class StackSampler:
+    """Folded stacks of one thread, sampled from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float = STACK_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="openmatch-stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Rerun:
+    """Phase timings of one page rerun, kept by the script thread that runs it"""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.thread_id = threading.get_ident()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._stack = [ROOT_PHASE]
+        self.started = self._since = time.perf_counter()
+
+    def _charge(self):
+        now = time.perf_counter()
+        self.phases[self._stack[-1]] += now - self._since
+        self._since = now
+
+    def enter(self, name: str):
+        self._charge()
+        self._stack.append(name)
+
+    def exit(self):
+        self._charge()
+        self._stack.pop()
+
+    def finish(self) -> float:
+        self._charge()
+        return time.perf_counter() - self.started
+
+
+def _active():
+    rerun = _current.get()
+    if rerun is not None and rerun.thread_id == threading.get_ident():
+        return rerun
+    return None
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Count the time spent in the block towards ``name`` (one of ``PHASES``)"""
+    rerun = _active()
+    if rerun is None:
+        yield
+        return
+    rerun.enter(name)
+    try:
+        yield
+    finally:
+        rerun.exit()
+
+
+def phased(name: str):
+    """Decorator form of ``phase()``"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed(iterable, name: str = "fetch"):
+    """Iterate ``iterable``, counting the wait for each item (not the loop body) towards ``name``"""
+    iterator = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+@contextlib.contextmanager
+def rerun(page: str):
+    """Profile one rerun of ``page`` when ``OPENMATCH_PROFILE=1``; a no-op otherwise"""
+    if not ENABLED or _current.get() is not None:
+        yield
+        return
+    current = Rerun(page)
+    reset = _current.set(current)
+    sampler = StackSampler(current.thread_id)
+    sampler.start()
+    profiler = None
+    if random.random() < SAMPLE_RATE:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler (a debugger, coverage...) already holds the hook
+            profiler = None
+    failed = None
+    try:
+        yield
+    except BaseException as e:
+        # Streamlit's rerun and stop requests end a script run this way too
+        failed = type(e).__name__
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+        seconds = current.finish()
+        _current.reset(reset)
+        _report(current, seconds, failed, sampler, profiler)
+
+
+def _report(current: Rerun, seconds: float, failed, sampler: StackSampler, profiler):
+    record = {
+        "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "page": current.page,
+        "session": ratelimit.current_session_id(),
+        "total_ms": round(seconds * 1000, 1),
+        "phases_ms": {name: round(spent * 1000, 1) for name, spent in current.phases.items()},
+        "ended_by": failed,
+    }
+    slow = record["total_ms"] >= SLOW_MS
+    if slow or profiler is not None:
+        try:
+            record["captures"] = _write_captures(current.page, sampler, profiler)
+            _append(record)
+        except OSError as e:
+            log.warning("could not write profile of %s: %s", current.page, e)
+    log.info(json.dumps(record))
+
+
+def _write_captures(page: str, sampler, profiler) -> list:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{page}"
+    written = []
+    if sampler is not None and sampler.stacks:
+        with open(os.path.join(PROFILE_DIR, f"{stem}.folded"), "w") as f:
+            f.write(sampler.folded())
+        written.append(f"{stem}.folded")
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{stem}.prof"))
+        written.append(f"{stem}.prof")
+    _prune()
+    return written
+
+
+def _prune():
+    captures = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith((".folded", ".prof")))
+    for name in captures[:max(0, len(captures) - MAX_CAPTURES)]:
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(PROFILE_DIR, name))
+
+
+def _append(record: dict):
+    path = os.path.join(PROFILE_DIR, "reruns.jsonl")
+    with _write_lock:
+        if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# -- reading the records back
+
+def load(directory: str = PROFILE_DIR) -> list:
+    path = os.path.join(directory, "reruns.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the rerun profiles written with OPENMATCH_PROFILE=1")
+    parser.add_argument("--dir", default=PROFILE_DIR, help="profile directory (OPENMATCH_PROFILE_DIR)")
+    parser.add_argument("--page", help="only reruns of this page")
+    parser.add_argument("--slowest", type=int, default=10, help="list this many of the slowest reruns")
+    args = parser.parse_args()
+
+    records = [record for record in load(args.dir) if not args.page or record["page"] == args.page]
+    if not records:
+        parser.exit(1, f"no rerun profiles in {args.dir}\n")
+
+    print(f"{'page':<12} {'reruns':>6} {'p50 ms':>8} {'p95 ms':>8}" + "".join(f" {name + ' %':>11}" for name in PHASES))
+    for page in sorted({record["page"] for record in records}):
+        mine = [record for record in records if record["page"] == page]
+        totals = [record["total_ms"] for record in mine]
+        spent = sum(totals) or 1
+        shares = [sum(record["phases_ms"].get(name, 0) for record in mine) / spent for name in PHASES]
+        print(
+            f"{page:<12} {len(mine):>6} {statistics.median(totals):>8.0f} {_percentile(totals, 0.95):>8.0f}"
+            + "".join(f" {share:>11.0%}" for share in shares)
+        )
+
+    print(f"\nslowest reruns (captures in {args.dir}):")
+    for record in sorted(records, key=lambda record: -record["total_ms"])[:args.slowest]:
+        phases = ", ".join(f"{name} {ms:.0f}" for name, ms in record["phases_ms"].items() if ms >= 1)
+        print(f"  {record['at']} {record['page']:<10} {record['total_ms']:>8.0f} ms  ({phases})  {' '.join(record.get('captures', []))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
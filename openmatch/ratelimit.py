@@ -0,0 +1,200 @@
+"""Rate-limit-aware scheduling of GitHub calls
+
+Every upstream request takes a slot from the process-wide ``scheduler`` first.
+The scheduler
+
+* tracks the remaining budget of each (token, resource) pair from GitHub's
+  ``X-RateLimit-*`` headers and delays calls once it is down to ``RESERVE``;
+* honours secondary rate limits (``Retry-After`` on 403/429) by pausing that
+  token until the given time;
+* hands out at most ``MAX_IN_FLIGHT`` concurrent slots, round-robin across
+  Streamlit sessions and at most ``MAX_PER_SESSION`` per session, so one heavy
+  user cannot starve everyone else.
+
+Waits longer than ``MAX_WAIT`` seconds raise ``RateLimitExceeded`` instead of
+pinning a script thread.
+"""
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+
+from openmatch.errors import RateLimitExceeded
+
+RESERVE = int(os.environ.get("OPENMATCH_RATE_RESERVE", "50"))
+MAX_WAIT = float(os.environ.get("OPENMATCH_RATE_MAX_WAIT", "30"))
+MAX_IN_FLIGHT = int(os.environ.get("OPENMATCH_MAX_IN_FLIGHT", "8"))
+MAX_PER_SESSION = int(os.environ.get("OPENMATCH_MAX_PER_SESSION", "3"))
+
+_session_id = contextvars.ContextVar("openmatch_session_id", default=None)
+
+
+def current_session_id() -> str:
+    """Streamlit session behind the current call ("background" outside a script run)"""
+    session = _session_id.get()
+    if session:
+        return session
+    if "streamlit" not in sys.modules:
+        # not running under Streamlit (benchmarks, crawlers): don't pay for the import
+        return "background"
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        ctx = None
+    return ctx.session_id if ctx else "background"
+
+
+@contextlib.contextmanager
+def session_scope(session: str):
+    """Attribute calls made on a worker thread to the session that started them"""
+    token = _session_id.set(session)
+    try:
+        yield
+    finally:
+        _session_id.reset(token)
+
+
+class Budget:
+    __slots__ = ("limit", "remaining", "reset_at", "blocked_until")
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+    def wait_seconds(self, now: float) -> float:
+        wait = self.blocked_until - now
+        if self.remaining is not None and self.remaining <= RESERVE and self.reset_at > now:
+            wait = max(wait, self.reset_at - now)
+        return max(wait, 0.0)
+
+
+class Scheduler:
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_per_session: int = MAX_PER_SESSION):
+        self.max_in_flight = max_in_flight
+        self.max_per_session = max_per_session
+        self._cond = threading.Condition()
+        self._budgets = {}
+        self._queues = OrderedDict()   # session -> waiting tickets, in round-robin order
+        self._running = Counter()      # session -> slots held
+        self._in_flight = 0
+
+    def budget(self, key) -> Budget:
+        with self._cond:
+            return self._budgets.setdefault(key, Budget())
+
+    def snapshot(self) -> dict:
+        """Current budgets, for display and metrics"""
+        with self._cond:
+            return {
+                key: {"limit": b.limit, "remaining": b.remaining, "reset_at": b.reset_at, "blocked_until": b.blocked_until}
+                for key, b in self._budgets.items()
+            }
+
+    @contextlib.contextmanager
+    def slot(self, key, session: str = None):
+        """Hold one upstream slot for ``key`` = (token scope, resource)"""
+        session = session or current_session_id()
+        self._wait_for_budget(key)
+        self._acquire(session, key)
+        try:
+            yield
+        finally:
+            self._release(session)
+
+    def _wait_for_budget(self, key):
+        while True:
+            budget = self.budget(key)
+            with self._cond:
+                now = time.time()
+                wait = budget.wait_seconds(now)
+                reset_at = max(budget.blocked_until, budget.reset_at)
+            if wait <= 0:
+                return
+            if wait > MAX_WAIT:
+                raise RateLimitExceeded(reset_at)
+            time.sleep(wait)
+
+    def _eligible(self, session: str, ticket) -> bool:
+        if self._in_flight >= self.max_in_flight or self._queues[session][0] is not ticket:
+            return False
+        # the first session (in round-robin order) that may still run gets the slot
+        for waiting in self._queues:
+            if self._running[waiting] < self.max_per_session:
+                return waiting == session
+        return False
+
+    def _acquire(self, session: str, key):
+        ticket = object()
+        with self._cond:
+            self._queues.setdefault(session, deque()).append(ticket)
+            while not self._eligible(session, ticket):
+                self._cond.wait()
+            queue = self._queues[session]
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            self._running[session] += 1
+            self._in_flight += 1
+            # spend one point up front so a burst can't overshoot the reserve
+            budget = self._budgets.setdefault(key, Budget())
+            if budget.remaining is not None:
+                budget.remaining -= 1
+            self._cond.notify_all()
+
+    def _release(self, session: str):
+        with self._cond:
+            self._running[session] -= 1
+            if not self._running[session]:
+                del self._running[session]
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def record(self, key, response) -> bool:
+        """Update the budget from a response; True if GitHub rate limited this call"""
+        headers = response.headers
+        now = time.time()
+        limited = False
+        with self._cond:
+            budget = self._budgets.setdefault(key, Budget())
+            if "X-RateLimit-Remaining" in headers:
+                budget.remaining = int(headers["X-RateLimit-Remaining"])
+                budget.limit = int(headers.get("X-RateLimit-Limit", budget.limit or 0)) or None
+                budget.reset_at = float(headers.get("X-RateLimit-Reset", budget.reset_at))
+            if response.status_code in (403, 429):
+                if "Retry-After" in headers:
+                    budget.blocked_until = now + float(headers["Retry-After"])
+                    limited = True
+                elif budget.remaining == 0:
+                    budget.blocked_until = budget.reset_at
+                    limited = True
+            self._cond.notify_all()
+        return limited
+
+    def exhausted(self, key, reset_at: str = None):
+        """Mark a budget as spent, e.g. after a GraphQL RATE_LIMITED error"""
+        with self._cond:
+            budget = self._budgets.setdefault(key, Budget())
+            budget.remaining = 0
+            if reset_at:
+                budget.reset_at = datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp()
+            budget.blocked_until = max(budget.blocked_until, budget.reset_at)
+
+    def observe_graphql(self, key, rate_limit: dict):
+        """Use a ``rateLimit { cost remaining resetAt }`` block when a query asks for one"""
+        with self._cond:
+            budget = self._budgets.setdefault(key, Budget())
+            budget.remaining = rate_limit.get("remaining", budget.remaining)
+            if rate_limit.get("resetAt"):
+                budget.reset_at = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00")).timestamp()
+
+
+scheduler = Scheduler()
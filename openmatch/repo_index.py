@@ -0,0 +1,394 @@
+"""Local index of candidate repositories for instant project matching
+
+An offline crawler pages through GitHub search per language and stores one row
+per repository in SQLite: language, stars, forks, license, topics, creation/push
+dates, open issues and open "good first issue" count.  The sidebar filters then
+run as plain SQL against this table in milliseconds; ``refresh`` only re-crawls
+repositories pushed since the previous crawl of each language.
+
+Search never returns more than 1,000 results per query, so a language is
+crawled in slices: star bands, each counted first (``COUNT_QUERY``, no nodes)
+and split while it matches more than that, by stars until the band is a single
+star count and then by creation date.  Only a slice of one star count created
+on one day can still be truncated; that is logged.
+
+    python -m openmatch.repo_index crawl --languages Python Go Rust
+    python -m openmatch.repo_index refresh --every 3600
+
+Both read the token from ``GITHUB_TOKEN``.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from openmatch import client
+
+log = logging.getLogger("openmatch.repo_index")
+
+INDEX_PATH = os.environ.get("OPENMATCH_INDEX_PATH", ".openmatch/repo_index.sqlite3")
+PAGE_SIZE = 50
+SEARCH_CAP = 1000
+#  (low, high) star bands a language's crawl starts from (high None: open-ended); split further as needed
+STAR_BANDS = [
+    (20000, None), (10000, 19999), (5000, 9999), (2000, 4999), (1000, 1999),
+    (500, 999), (250, 499), (100, 249), (50, 99), (25, 49), (10, 24),
+]
+#  creation dates a slice is split over once its stars can't be split any further
+FIRST_CREATED = date(2008, 1, 1)
+CANDIDATE_CAP = 50000
+#  just what ranking needs; the winners' full rows are loaded afterwards with ``nodes``
+CANDIDATE_COLUMNS = ("rowid", "language", "languages", "stars", "pushed_at", "good_first_issues")
+ORDER_COLUMNS = {"Stars": "stars DESC", "Forks": "forks DESC", "Recent": "pushed_at DESC"}
+
+SEARCH_QUERY = """
+query($q: String!, $first: Int!, $after: String) {
+  search(query: $q, type: REPOSITORY, first: $first, after: $after) {
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    nodes {
+      ... on Repository {
+        id
+        nameWithOwner
+        name
+        description
+        url
+        createdAt
+        pushedAt
+        stargazerCount
+        forkCount
+        owner {
+          login
+          avatarUrl
+        }
+        primaryLanguage {
+          name
+        }
+        languages(first: 10, orderBy: {field: SIZE, direction: DESC}) {
+          edges {
+            size
+            node {
+              name
+            }
+          }
+        }
+        licenseInfo {
+          spdxId
+        }
+        repositoryTopics(first: 20) {
+          nodes {
+            topic {
+              name
+            }
+          }
+        }
+        issues(states: OPEN) {
+          totalCount
+        }
+        goodFirstIssues: issues(states: OPEN, labels: ["good first issue"]) {
+          totalCount
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+COUNT_QUERY = """
+query($q: String!) {
+  search(query: $q, type: REPOSITORY, first: 0) {
+    repositoryCount
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id TEXT PRIMARY KEY,
+    name_with_owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    owner_avatar TEXT,
+    description TEXT,
+    url TEXT NOT NULL,
+    language TEXT,
+    languages TEXT,
+    stars INTEGER NOT NULL,
+    forks INTEGER NOT NULL,
+    license TEXT,
+    topics TEXT,
+    created_at TEXT,
+    pushed_at TEXT,
+    open_issues INTEGER,
+    good_first_issues INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS repos_language_stars ON repos(language, stars);
+CREATE INDEX IF NOT EXISTS repos_created ON repos(created_at);
+CREATE TABLE IF NOT EXISTS crawls (
+    language TEXT PRIMARY KEY,
+    crawled_at TEXT NOT NULL
+);
+"""
+
+
+_schema_lock = threading.Lock()
+_schema_ready = set()   # index paths this process has created the schema in
+
+
+def connect(path: str = None) -> sqlite3.Connection:
+    path = path or INDEX_PATH
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    created = not os.path.exists(path)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    with _schema_lock:
+        if created or path not in _schema_ready:
+            conn.executescript(SCHEMA)
+            _schema_ready.add(path)
+    return conn
+
+
+@contextlib.contextmanager
+def _connection(conn: sqlite3.Connection = None):
+    """``conn`` if given, else a connection of its own, closed afterwards"""
+    if conn is not None:
+        yield conn
+        return
+    with contextlib.closing(connect()) as conn:
+        yield conn
+
+
+def _row(node: dict) -> tuple:
+    topics = [t["topic"]["name"].lower() for t in node["repositoryTopics"]["nodes"]]
+    languages = {edge["node"]["name"]: edge["size"] for edge in node["languages"]["edges"]}
+    return (
+        node["id"],
+        node["nameWithOwner"],
+        node["name"],
+        node["owner"]["login"],
+        node["owner"].get("avatarUrl"),
+        node.get("description"),
+        node["url"],
+        (node.get("primaryLanguage") or {}).get("name"),
+        json.dumps(languages),
+        node["stargazerCount"],
+        node["forkCount"],
+        ((node.get("licenseInfo") or {}).get("spdxId") or "").upper() or None,
+        "," + ",".join(topics) + "," if topics else "",
+        node.get("createdAt"),
+        node.get("pushedAt"),
+        node["issues"]["totalCount"],
+        node["goodFirstIssues"]["totalCount"],
+        time.time(),
+    )
+
+
+def _store(conn: sqlite3.Connection, nodes: list) -> int:
+    rows = [_row(node) for node in nodes if node and node.get("id")]
+    conn.executemany(
+        "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def _query(language: str, stars: tuple, created: tuple, since: str = None) -> str:
+    low, high = stars
+    q = f"language:{json.dumps(language)} stars:{f'>={low}' if high is None else f'{low}..{high}'} archived:false is:public"
+    if created:
+        q += f" created:{created[0].isoformat()}..{created[1].isoformat()}"
+    if since:
+        q += f" pushed:>={since}"
+    return q
+
+
+def _split(stars: tuple, created: tuple) -> list:
+    """Two halves of a slice: by stars while the band is wider than one count, then by creation date"""
+    low, high = stars
+    if high is None:
+        return [((low, low * 2 - 1), created), ((low * 2, None), created)]
+    if low < high:
+        middle = (low + high) // 2
+        return [((low, middle), created), ((middle + 1, high), created)]
+    first, last = created or (FIRST_CREATED, datetime.now(timezone.utc).date())
+    if first < last:
+        middle = first + (last - first) / 2
+        return [(stars, (first, middle)), (stars, (middle + timedelta(days=1), last))]
+    return []
+
+
+def crawl_language(token: str, language: str, conn: sqlite3.Connection, since: str = None) -> int:
+    """Index every repository of ``language`` (pushed since ``since``, if given)"""
+    stored = 0
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    slices = [(band, None) for band in reversed(STAR_BANDS)]
+    while slices:
+        stars, created = slices.pop()
+        q = _query(language, stars, created, since)
+        count = client.graphql(token, COUNT_QUERY, {"q": q}, op="index_count")["search"]["repositoryCount"]
+        if not count:
+            continue
+        if count > SEARCH_CAP:
+            halves = _split(stars, created)
+            if halves:
+                slices += reversed(halves)
+                continue
+            log.warning("%s: %d results, only the first %d are indexed", q, count, SEARCH_CAP)
+        after = None
+        while True:
+            data = client.graphql(
+                token, SEARCH_QUERY, {"q": q, "first": PAGE_SIZE, "after": after}, op="index_crawl"
+            )
+            search = data["search"]
+            stored += _store(conn, search["nodes"])
+            if not search["pageInfo"]["hasNextPage"]:
+                break
+            after = search["pageInfo"]["endCursor"]
+    conn.execute("INSERT OR REPLACE INTO crawls VALUES (?, ?)", (language, started))
+    conn.commit()
+    return stored
+
+
+def refresh(token: str, conn: sqlite3.Connection, languages: list = None) -> dict:
+    """Incrementally re-crawl each language from its last crawl time"""
+    last = {row["language"]: row["crawled_at"] for row in conn.execute("SELECT * FROM crawls")}
+    return {
+        language: crawl_language(token, language, conn, since=last.get(language))
+        for language in (languages or list(last))
+    }
+
+
+def covered_languages(conn: sqlite3.Connection = None) -> set:
+    with _connection(conn) as conn:
+        return {row["language"].lower() for row in conn.execute("SELECT language FROM crawls")}
+
+
+def last_crawl(conn: sqlite3.Connection = None):
+    with _connection(conn) as conn:
+        return conn.execute("SELECT MIN(crawled_at) FROM crawls").fetchone()[0]
+
+
+def covers(langs: list) -> bool:
+    """True when every language has been crawled at least once"""
+    if not langs or not os.path.exists(INDEX_PATH):
+        return False
+    return {lang.lower() for lang in langs} <= covered_languages()
+
+
+def _where(langs: list, filters: dict):
+    clauses = [f"language COLLATE NOCASE IN ({', '.join('?' for _ in langs)})"]
+    params = list(langs)
+    if filters.get("min_stars"):
+        clauses.append("stars >= ?")
+        params.append(int(filters["min_stars"]))
+    if filters.get("license") and filters["license"] != "Any":
+        clauses.append("license = ?")
+        params.append(filters["license"].upper())
+    for topic in (filters.get("topics") or "").split(","):
+        if topic.strip():
+            clauses.append("topics LIKE ?")
+            params.append(f"%,{topic.strip().lower()},%")
+    if filters.get("min_issues"):
+        clauses.append("open_issues > ?")
+        params.append(int(filters["min_issues"]))
+    if filters.get("date"):
+        op = {"Before": "<", "After": ">", "On": "="}[filters.get("date_text", "After")]
+        clauses.append(f"substr(created_at, 1, 10) {op} ?")
+        params.append(str(filters["date"]))
+    return " AND ".join(clauses), params
+
+
+def version() -> float:
+    """Changes whenever the index file is written"""
+    return os.path.getmtime(INDEX_PATH) if os.path.exists(INDEX_PATH) else 0.0
+
+
+def candidates(langs: list, filters: dict, cap: int = CANDIDATE_CAP, conn: sqlite3.Connection = None) -> list:
+    """Plain tuples (``CANDIDATE_COLUMNS``) of every row matching the filters, for ranking"""
+    where, params = _where(langs, filters)
+    with _connection(conn) as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor.execute(
+            f"SELECT {', '.join(CANDIDATE_COLUMNS)} FROM repos WHERE {where} ORDER BY stars DESC LIMIT ?",
+            params + [cap],
+        ).fetchall()
+
+
+def nodes(rowids: list, conn: sqlite3.Connection = None) -> list:
+    """Search nodes for the given rows, in the given order"""
+    rowids = [int(rowid) for rowid in rowids]
+    with _connection(conn) as conn:
+        rows = conn.execute(
+            f"SELECT rowid, * FROM repos WHERE rowid IN ({', '.join('?' for _ in rowids)})", rowids
+        ).fetchall()
+    by_id = {row["rowid"]: row for row in rows}
+    return [to_node(by_id[rowid]) for rowid in rowids if rowid in by_id]
+
+
+def search(langs: list, filters: dict, limit: int = 9, offset: int = 0, conn: sqlite3.Connection = None) -> list:
+    """Repositories matching the sidebar filters, shaped like GraphQL search nodes"""
+    where, params = _where(langs, filters)
+    order = ORDER_COLUMNS.get(filters.get("order_by"), "stars DESC")
+    with _connection(conn) as conn:
+        rows = conn.execute(
+            f"SELECT * FROM repos WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+    return [to_node(row) for row in rows]
+
+
+def to_node(row: sqlite3.Row) -> dict:
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "description": row["description"],
+        "stargazerCount": row["stars"],
+        "url": row["url"],
+        "owner": {"login": row["owner"], "avatarUrl": row["owner_avatar"]},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl GitHub into the local repository index")
+    parser.add_argument("command", choices=["crawl", "refresh"])
+    parser.add_argument("--languages", nargs="*", help="languages to crawl (refresh: defaults to all indexed)")
+    parser.add_argument("--every", type=int, default=0, help="repeat every N seconds")
+    args = parser.parse_args(argv)
+
+    token = os.environ["GITHUB_TOKEN"]
+    with contextlib.closing(connect()) as conn:
+        while True:
+            if args.command == "crawl":
+                counts = {language: crawl_language(token, language, conn) for language in args.languages or []}
+            else:
+                counts = refresh(token, conn, args.languages)
+            print(json.dumps({"indexed": counts, "at": datetime.now(timezone.utc).isoformat()}))
+            if not args.every:
+                break
+            # after the first full crawl, later rounds only pick up what was pushed since
+            args.command = "refresh"
+            time.sleep(args.every)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Retries, circuit breaking and request hedging for GitHub calls
+
+``call()`` wraps one logical request:
+
+* idempotent requests (GET, GraphQL queries) are retried on 502/503/504,
+  timeouts, dropped connections and transient GraphQL errors, with full-jitter
+  exponential backoff;
+* each endpoint ("graphql", "core") has a circuit breaker that opens after
+  ``BREAKER_THRESHOLD`` consecutive transient failures and fails fast for
+  ``BREAKER_COOLDOWN`` seconds before letting a single trial through;
+* with ``OPENMATCH_HEDGE=1``, a request still running after its operation's
+  observed p95 latency gets a duplicate, and whichever answers first wins.
+"""
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+
+import requests
+
+from openmatch import ratelimit, telemetry
+from openmatch.errors import CircuitOpenError, GitHubError, TransientGitHubError
+
+RETRY_ATTEMPTS = int(os.environ.get("OPENMATCH_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("OPENMATCH_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.environ.get("OPENMATCH_BACKOFF_CAP", "8"))
+RETRYABLE_STATUS = {502, 503, 504}
+
+BREAKER_THRESHOLD = int(os.environ.get("OPENMATCH_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("OPENMATCH_BREAKER_COOLDOWN", "30"))
+
+HEDGE = os.environ.get("OPENMATCH_HEDGE", "0") == "1"
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TransientGitHubError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.time() - self.opened_at >= self.cooldown else "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return
+            raise CircuitOpenError(self.name, self.opened_at + self.cooldown)
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.threshold:
+                self.opened_at = time.time()
+            self._trial_running = False
+
+    def release(self):
+        """The call ended without telling us anything about the endpoint's health"""
+        with self._lock:
+            self._trial_running = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call durations for one operation"""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self):
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def timed(self, send):
+        started = time.perf_counter()
+        result = send()
+        self.add(time.perf_counter() - started)
+        return result
+
+
+_breakers = {}
+_latency = defaultdict(LatencyTracker)
+_registry_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openmatch-hedge")
+
+
+def breaker(endpoint: str) -> CircuitBreaker:
+    with _registry_lock:
+        return _breakers.setdefault(endpoint, CircuitBreaker(endpoint))
+
+
+def _hedged(send, op: str):
+    tracker = _latency[op]
+    threshold = tracker.p95()
+    if not HEDGE or threshold is None:
+        return tracker.timed(send)
+
+    session = ratelimit.current_session_id()
+
+    def run():
+        with ratelimit.session_scope(session):
+            return tracker.timed(send)
+
+    primary = _hedge_pool.submit(run)
+    try:
+        return primary.result(timeout=threshold)
+    except FutureTimeout:
+        pass
+    backup = _hedge_pool.submit(run)
+    for future in as_completed([primary, backup]):
+        if future.exception() is None:
+            return future.result()
+    raise primary.exception()
+
+
+def call(send, endpoint: str, op: str, idempotent: bool = True):
+    """Run ``send()`` with breaker, retries (if idempotent) and optional hedging"""
+    circuit = breaker(endpoint)
+    attempts = RETRY_ATTEMPTS if idempotent else 1
+    for attempt in range(attempts):
+        circuit.before_call()
+        try:
+            result = _hedged(send, op) if idempotent else send()
+        except Exception as e:
+            if not is_transient(e):
+                if isinstance(e, (requests.HTTPError, GitHubError)):
+                    # GitHub answered (a 404, a GraphQL error...), so the endpoint itself is up
+                    circuit.success()
+                else:
+                    circuit.release()
+                raise
+            circuit.failure()
+            if attempt == attempts - 1:
+                raise
+            telemetry.retry(op, endpoint, e, attempt + 1)
+            time.sleep(backoff(attempt))
+            continue
+        circuit.success()
+        return result
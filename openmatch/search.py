@@ -0,0 +1,135 @@
+"""Canonical GitHub search queries, cached once for every user
+
+Search results restricted to ``is:public`` are the same whoever asks, so they
+are cached under a shared scope instead of per token.  To make equivalent
+searches hit the same entry, ``query_string`` builds one canonical form:
+languages lowercased, quoted when needed and sorted; topics normalized, deduped
+and sorted; filters that don't filter anything (license "Any", 0 stars, empty
+topics...) dropped; qualifiers in a fixed order.
+"""
+import heapq
+
+from openmatch import client
+
+SORTS = {"Stars": "stars", "Forks": "forks", "Recent": "updated"}
+#  the node field each sort orders by (descending), to merge sorted pages of several searches
+SORT_FIELDS = {"stars": "stargazerCount", "forks": "forkCount", "updated": "updatedAt"}
+DATE_OPERATORS = {"Before": "<", "After": ">", "On": ""}
+#  what the project page searches with before any filter is touched
+DEFAULT_FILTERS = {"min_stars": 10, "license": "Any"}
+#  fixed per-language page size, so each language's cached pages stay valid whatever else is selected
+LANGUAGE_PAGE_SIZE = 50
+
+REPOSITORY_SEARCH_QUERY = """
+query($q: String!, $first: Int!, $after: String) {
+  search(query: $q, type: REPOSITORY, first: $first, after: $after) {
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    edges {
+      node {
+        ... on Repository {
+          id
+          name
+          description
+          stargazerCount
+          forkCount
+          url
+          pushedAt
+          updatedAt
+          owner {
+            login
+            avatarUrl
+          }
+          primaryLanguage {
+            name
+          }
+          languages(first: 10, orderBy: {field: SIZE, direction: DESC}) {
+            edges {
+              size
+              node {
+                name
+              }
+            }
+          }
+          goodFirstIssues: issues(states: OPEN, labels: ["good first issue"]) {
+            totalCount
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+
+def _term(value: str) -> str:
+    value = value.strip().lower()
+    return f'"{value}"' if " " in value else value
+
+
+def canonical_filters(filters: dict) -> dict:
+    """Only the filters that narrow the search, in normalized form"""
+    filters = filters or {}
+    canonical = {}
+    if filters.get("min_stars"):
+        canonical["min_stars"] = int(filters["min_stars"])
+    if filters.get("license") and filters["license"] != "Any":
+        canonical["license"] = filters["license"].lower()
+    topics = sorted({t.strip().lower() for t in (filters.get("topics") or "").split(",") if t.strip()})
+    if topics:
+        canonical["topics"] = topics
+    if filters.get("min_issues"):
+        canonical["min_issues"] = int(filters["min_issues"])
+    if filters.get("date"):
+        canonical["date"] = (DATE_OPERATORS[filters.get("date_text", "After")], str(filters["date"]))
+    if filters.get("order_by") in SORTS:
+        canonical["sort"] = SORTS[filters["order_by"]]
+    return canonical
+
+
+def query_string(langs: list, filters: dict = None) -> str:
+    """The canonical search string for ``langs`` and the sidebar ``filters``"""
+    filters = canonical_filters(filters)
+    parts = ["is:public"]
+    parts += [f"language:{lang}" for lang in sorted({_term(lang) for lang in langs})]
+    parts += [f"topic:{_term(topic)}" for topic in filters.get("topics", [])]
+    if "min_stars" in filters:
+        parts.append(f"stars:>={filters['min_stars']}")
+    if "license" in filters:
+        parts.append(f"license:{filters['license']}")
+    if "min_issues" in filters:
+        parts.append(f"issues:>{filters['min_issues']}")
+    if "date" in filters:
+        operator, day = filters["date"]
+        parts.append(f"created:{operator}{day}")
+    if "sort" in filters:
+        parts.append(f"sort:{filters['sort']}")
+    return " ".join(parts)
+
+
+def merge_sorted(pages: list, filters: dict) -> list:
+    """Nodes of several searches sorted by the same ``order_by``, merged in that order"""
+    field = SORT_FIELDS[canonical_filters(filters)["sort"]]
+    return list(heapq.merge(*pages, key=lambda node: node[field], reverse=True))
+
+
+def cached_search(token: str, op: str, query: str, variables: dict) -> dict:
+    """Run a search document whose ``$q`` came from ``query_string``, cached for everyone"""
+    if "is:public" not in variables["q"].split():
+        raise ValueError("shared search results must be restricted to is:public")
+    return client.cached_graphql(token, op, query, variables, shared=True)
+
+
+def repositories(token: str, langs: list, filters: dict, first: int, after: str = None):
+    """One page of public repositories matching ``langs`` and ``filters``: ``(nodes, pageInfo)``"""
+    variables = {"q": query_string(langs, filters), "first": first, "after": after}
+    data = cached_search(token, "search", REPOSITORY_SEARCH_QUERY, variables)
+    nodes = [edge["node"] for edge in data["search"]["edges"] if edge.get("node")]
+    return nodes, data["search"]["pageInfo"]
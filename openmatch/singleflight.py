@@ -0,0 +1,70 @@
+"""Coalescing of identical concurrent calls
+
+When several sessions ask for the same thing at the same moment (a popular
+profile, the same search during a launch), only the first caller runs it; the
+others wait for that call and share its result (or its exception).  Nothing is
+remembered once the call finishes: that is the response cache's job.
+
+Calls shared across tokens pass ``retry_key``: a follower never inherits the
+leader's failure (a revoked or exhausted token is the leader's problem), it
+runs the call again itself, coalesced only with callers of the same
+``retry_key``.
+"""
+import copy
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, share=copy.deepcopy, retry_key=None):
+        """Run ``fn()`` once per ``key`` among concurrent callers
+
+        Followers get ``share(result)``: by default a deep copy, so no caller can
+        mutate what another one is holding.  If the leader fails, followers get
+        its exception, or with ``retry_key`` run ``fn()`` again under that key.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                if retry_key is not None:
+                    return self.do(retry_key, fn, share)
+                raise call.error
+            return share(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,188 @@
+"""One-round-trip "user snapshot" for the stats dashboard
+
+Profile, counts, the contribution calendar, PRs by repository and the most
+recently pushed repositories (with their languages) come back from a single
+GraphQL document, cached as one unit.  Every dashboard section reads from it
+instead of sending its own overlapping ``user(login:)`` query.
+"""
+from datetime import date, timedelta
+
+from openmatch import cache, client
+
+#  page size when listing repositories beyond the snapshot's first page
+NAMES_PAGE_SIZE = 100
+
+SNAPSHOT_QUERY = """
+fragment ProfileFields on User {
+  login
+  name
+  email
+  avatarUrl
+  bio
+  createdAt
+  location
+  websiteUrl
+}
+
+fragment CountFields on User {
+  publicRepos: repositories(isFork: false, privacy: PUBLIC) {
+    totalCount
+  }
+  privateRepos: repositories(isFork: false, privacy: PRIVATE) {
+    totalCount
+  }
+  pullRequests {
+    totalCount
+  }
+  issues {
+    totalCount
+  }
+}
+
+fragment ContributionFields on User {
+  contributionsCollection {
+    totalCommitContributions
+    totalIssueContributions
+    totalPullRequestContributions
+    contributionCalendar {
+      totalContributions
+      weeks {
+        contributionDays {
+          date
+          contributionCount
+          weekday
+        }
+      }
+    }
+    pullRequestContributionsByRepository {
+      contributions {
+        totalCount
+      }
+      repository {
+        name
+      }
+    }
+  }
+}
+
+fragment RepositoryFields on User {
+  repositories(first: 100, orderBy: {field: PUSHED_AT, direction: DESC}) {
+    totalCount
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    nodes {
+      name
+      nameWithOwner
+      pushedAt
+      languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+        edges {
+          size
+          node {
+            name
+          }
+        }
+      }
+    }
+  }
+}
+
+query UserSnapshot($login: String!) {
+  user(login: $login) {
+    ...ProfileFields
+    ...CountFields
+    ...ContributionFields
+    ...RepositoryFields
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+REPOSITORY_NAMES_QUERY = """
+query($login: String!, $first: Int!, $after: String) {
+  user(login: $login) {
+    repositories(first: $first, after: $after, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        name
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+
+def get_user_snapshot(token: str, login: str) -> dict:
+    """Fetch (or serve from cache) the whole snapshot for ``login``"""
+    data = client.cached_graphql(token, "user_snapshot", SNAPSHOT_QUERY, {"login": login})
+    if not data.get("user"):
+        raise ValueError(f"GitHub user '{login}' not found")
+    return data
+
+
+def invalidate(token: str, login: str):
+    """Drop the cached snapshot so the next ``get_user_snapshot`` asks GitHub again"""
+    cache.get_cache().delete(cache.make_key("user_snapshot", SNAPSHOT_QUERY, {"login": login}, cache.token_scope(token)))
+
+
+def user(snapshot: dict) -> dict:
+    return snapshot["user"]
+
+
+def contribution_days(snapshot: dict, num_days: int = None) -> list:
+    """``[(date, count), ...]`` from the calendar, optionally only the last ``num_days``"""
+    weeks = user(snapshot)["contributionsCollection"]["contributionCalendar"]["weeks"]
+    days = [
+        (date.fromisoformat(day["date"]), day["contributionCount"])
+        for week in weeks
+        for day in week["contributionDays"]
+    ]
+    if num_days is not None:
+        start = date.today() - timedelta(days=num_days)
+        days = [(day, count) for day, count in days if day >= start]
+    return days
+
+
+def pull_requests_by_repository(snapshot: dict) -> list:
+    """``[(repository name, PR count), ...]``"""
+    contributions = user(snapshot)["contributionsCollection"]["pullRequestContributionsByRepository"]
+    return [(c["repository"]["name"], c["contributions"]["totalCount"]) for c in contributions]
+
+
+def repositories(snapshot: dict) -> dict:
+    """The first page of the ``repositories`` connection, newest push first"""
+    return user(snapshot)["repositories"]
+
+
+def repository_names(snapshot: dict) -> list:
+    return [repo["name"] for repo in repositories(snapshot)["nodes"]]
+
+
+def all_repository_names(token: str, login: str, snapshot: dict) -> list:
+    """Every repository name, newest push first: the snapshot's page, then one request per 100 more
+
+    Not cached: callers hold the result for the session (``userdata.UserData``).
+    """
+    page = repositories(snapshot)
+    names = [repo["name"] for repo in page["nodes"]]
+    while page["pageInfo"]["hasNextPage"]:
+        variables = {"login": login, "first": NAMES_PAGE_SIZE, "after": page["pageInfo"]["endCursor"]}
+        data = client.graphql(token, REPOSITORY_NAMES_QUERY, variables, op="repository_names")
+        page = (data.get("user") or {}).get("repositories")
+        if not page:
+            break
+        names += [repo["name"] for repo in page["nodes"]]
+    return names
@@ -0,0 +1,258 @@
+"""Per-call instrumentation of the GitHub traffic
+
+Every request the client sends is recorded as a ``Call``.  Each call carries its
+logical operation (``op``, e.g. ``user_snapshot``), the rate-limit resource,
+status, time queued behind the scheduler and time on the wire, bytes each way
+and, for GraphQL, the ``rateLimit.cost`` (every query document selects
+``rateLimit { cost remaining resetAt }``, which the scheduler reads too).
+Response-cache lookups and retries are recorded next to the calls.  The records feed:
+
+* process-wide counters and histograms, rendered in the Prometheus text format
+  by ``prometheus_text()`` and served on ``OPENMATCH_METRICS_PORT`` when set;
+* one JSON line per event on the ``openmatch.calls`` logger, written to
+  ``OPENMATCH_CALL_LOG`` (a path, or ``-`` for stderr) when set;
+* a short per-session history, so a page can list the calls behind the
+  current rerun (``mark()`` then ``since(mark)``), which ``app.py`` shows in
+  the sidebar when ``OPENMATCH_DEBUG_PANEL=1``.
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from openmatch import ratelimit
+
+log = logging.getLogger("openmatch.calls")
+
+METRICS_PORT = os.environ.get("OPENMATCH_METRICS_PORT")
+CALL_LOG = os.environ.get("OPENMATCH_CALL_LOG")
+DEBUG_PANEL = os.environ.get("OPENMATCH_DEBUG_PANEL", "0") == "1"
+#  upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+#  events kept per session, and sessions kept, for the rerun view
+HISTORY_SIZE = 500
+MAX_SESSIONS = 256
+
+HELP = {
+    "openmatch_github_requests_total": ("counter", "GitHub requests sent, by operation, resource and status"),
+    "openmatch_github_request_seconds": ("histogram", "Time on the wire per GitHub request"),
+    "openmatch_github_queued_seconds_total": ("counter", "Time requests waited for a rate-limit scheduler slot"),
+    "openmatch_github_request_bytes_total": ("counter", "Request body bytes sent to GitHub"),
+    "openmatch_github_response_bytes_total": ("counter", "Response body bytes received from GitHub"),
+    "openmatch_github_graphql_cost_total": ("counter", "GraphQL rate-limit points spent, where the query reports them"),
+    "openmatch_github_retries_total": ("counter", "Requests retried after a transient failure"),
+    "openmatch_cache_lookups_total": ("counter", "Response-cache lookups, by operation and result (hit, stale, miss)"),
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)    # (name, labels) -> value
+_histograms = {}                  # (name, labels) -> [count per bucket..., +Inf, sum]
+_history = OrderedDict()          # session -> deque of events, least recently used first
+_sequence = itertools.count(1)
+_started = False
+
+
+class Call:
+    """One request to GitHub; ``client`` fills it in while sending"""
+
+    __slots__ = ("op", "resource", "method", "status", "queued", "seconds", "bytes_out", "bytes_in", "cost", "error")
+
+    def __init__(self, op: str, resource: str, method: str = "GET"):
+        self.op = op
+        self.resource = resource
+        self.method = method
+        self.status = None
+        self.queued = 0.0
+        self.seconds = 0.0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.cost = None
+        self.error = None
+
+    def sent(self, response, queued: float, seconds: float):
+        self.status = response.status_code
+        self.queued = queued
+        self.seconds = seconds
+        body = response.request.body
+        self.bytes_out = len(body) if body else 0
+        self.bytes_in = len(response.content)
+
+    def failed(self, error: Exception):
+        self.error = type(error).__name__
+
+    @property
+    def status_label(self) -> str:
+        return str(self.status) if self.status is not None else "error"
+
+
+def _labels(**labels) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _inc(name: str, value: float = 1, **labels):
+    _counters[(name, _labels(**labels))] += value
+
+
+def _observe(name: str, value: float, **labels):
+    key = (name, _labels(**labels))
+    counts = _histograms.get(key)
+    if counts is None:
+        counts = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+    for i, bound in enumerate(BUCKETS):
+        if value <= bound:
+            counts[i] += 1
+    counts[len(BUCKETS)] += 1
+    counts[-1] += value
+
+
+def _remember(event: dict):
+    # caller holds _lock
+    session = event["session"]
+    events = _history.get(session)
+    if events is None:
+        events = _history[session] = deque(maxlen=HISTORY_SIZE)
+        while len(_history) > MAX_SESSIONS:
+            _history.popitem(last=False)
+    else:
+        _history.move_to_end(session)
+    events.append(event)
+
+
+def _emit(kind: str, op: str, **fields):
+    event = {"seq": next(_sequence), "at": time.time(), "kind": kind, "op": op,
+             "session": ratelimit.current_session_id(), **fields}
+    with _lock:
+        if kind == "request":
+            labels = {"op": op, "resource": fields["resource"]}
+            _inc("openmatch_github_requests_total", status=fields["status"], **labels)
+            _observe("openmatch_github_request_seconds", fields["seconds"], **labels)
+            _inc("openmatch_github_queued_seconds_total", fields["queued"], **labels)
+            _inc("openmatch_github_request_bytes_total", fields["bytes_out"], **labels)
+            _inc("openmatch_github_response_bytes_total", fields["bytes_in"], **labels)
+            if fields["cost"] is not None:
+                _inc("openmatch_github_graphql_cost_total", fields["cost"], op=op)
+        elif kind == "cache":
+            _inc("openmatch_cache_lookups_total", op=op, result=fields["result"])
+        elif kind == "retry":
+            _inc("openmatch_github_retries_total", op=op, endpoint=fields["endpoint"])
+        _remember(event)
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps(event, default=str))
+
+
+def record(call: Call):
+    """Account for a finished (or failed) request"""
+    _emit(
+        "request", call.op,
+        resource=call.resource, method=call.method, status=call.status_label,
+        queued=round(call.queued, 4), seconds=round(call.seconds, 4),
+        bytes_out=call.bytes_out, bytes_in=call.bytes_in, cost=call.cost, error=call.error,
+    )
+
+
+def cache_lookup(op: str, result: str):
+    """A response-cache lookup for ``op``: ``hit``, ``stale`` or ``miss``"""
+    _emit("cache", op, result=result)
+
+
+def retry(op: str, endpoint: str, error: Exception, attempt: int):
+    _emit("retry", op, endpoint=endpoint, error=type(error).__name__, attempt=attempt)
+
+
+# -- the rerun view
+
+def mark() -> int:
+    """A position in the event stream; ``since(mark)`` returns what came after it"""
+    with _lock:
+        return next(_sequence)
+
+
+def since(position: int, session: str = None) -> list:
+    """This session's events recorded after ``position``, oldest first"""
+    session = session or ratelimit.current_session_id()
+    with _lock:
+        return [event for event in _history.get(session, ()) if event["seq"] > position]
+
+
+# -- export
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series(name: str, labels: tuple, value, extra: tuple = ()) -> str:
+    pairs = ",".join(f'{key}="{_escape(val)}"' for key, val in labels + extra)
+    return f"{name}{{{pairs}}} {value:g}" if pairs else f"{name} {value:g}"
+
+
+def prometheus_text() -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(counts)) for key, counts in _histograms.items())
+    lines = []
+    for name, (kind, description) in HELP.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        if kind == "histogram":
+            for (metric, labels), counts in histograms:
+                if metric != name:
+                    continue
+                for bound, count in zip(BUCKETS, counts):
+                    lines.append(_series(f"{name}_bucket", labels, count, (("le", f"{bound:g}"),)))
+                lines.append(_series(f"{name}_bucket", labels, counts[len(BUCKETS)], (("le", "+Inf"),)))
+                lines.append(_series(f"{name}_sum", labels, counts[-1]))
+                lines.append(_series(f"{name}_count", labels, counts[len(BUCKETS)]))
+        else:
+            lines += [_series(name, labels, value) for (metric, labels), value in counters if metric == name]
+    return "\n".join(lines) + "\n"
+
+
+def start_from_env():
+    """Serve ``/metrics`` and write the call log as configured; safe to call on every rerun"""
+    global _started
+    if _started:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    if CALL_LOG:
+        handler = logging.StreamHandler() if CALL_LOG == "-" else logging.FileHandler(CALL_LOG)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    if METRICS_PORT:
+        _serve(int(METRICS_PORT))
+
+
+def _serve(port: int):
+    # imported here: app.py imports this module on every cold start, and most deployments don't scrape
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("", port), MetricsHandler)
+    except OSError as e:
+        # another worker on this host already serves the port
+        logging.getLogger("openmatch.telemetry").warning("metrics port %s unavailable: %s", port, e)
+        return
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="openmatch-metrics", daemon=True).start()
@@ -0,0 +1,90 @@
+"""Streamlit helpers shared by the pages"""
+import json
+
+import requests
+import streamlit as st
+
+from openmatch import telemetry
+from openmatch.errors import CircuitOpenError, GitHubError, RateLimitExceeded
+from openmatch.userdata import UserData
+
+
+def show_error(e: Exception):
+    """Turn an exception from the GitHub layer into a friendly message"""
+    if isinstance(e, RateLimitExceeded):
+        st.warning(f"⏳ {str(e)}")
+    elif isinstance(e, CircuitOpenError):
+        st.warning(f"🚧 {str(e)}")
+    elif isinstance(e, requests.exceptions.RequestException):
+        st.error(f"🔌 Network error: {str(e)}")
+    elif isinstance(e, json.JSONDecodeError):
+        st.error("❌ Invalid API response")
+    elif isinstance(e, GitHubError):
+        st.error(f"🐙 GitHub error: {str(e)}")
+    else:
+        st.error(f"⚠️ Unexpected error: {str(e)}")
+
+
+# error handling decorator
+def handle_errors(func):
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            show_error(e)
+    return wrapper
+
+
+def credentials_form(name_label: str, token_label: str, name_help: str = None, token_help: str = None):
+    """Username and token, sent together on "Connect" so typing doesn't rerun the page"""
+    with st.form("credentials"):
+        login = st.text_input(name_label, help=name_help)
+        token = st.text_input(token_label, type="password", help=token_help)
+        st.form_submit_button("Connect")
+    return login.strip(), token.strip()
+
+
+def user_data(token: str, login: str):
+    """The session's ``UserData`` for these credentials (None without them)"""
+    if not token or not login:
+        st.session_state.pop("user_data", None)
+        return None
+    data = st.session_state.get("user_data")
+    if data is None or data.credentials != (token, login):
+        data = st.session_state["user_data"] = UserData(token, login)
+    return data
+
+
+def debug_panel(position: int):
+    """Sidebar list of the GitHub calls, cache lookups and retries since ``position``"""
+    events = telemetry.since(position)
+    requests_ = [event for event in events if event["kind"] == "request"]
+    lookups = [event for event in events if event["kind"] == "cache"]
+    hits = sum(event["result"] != "miss" for event in lookups)
+    with st.sidebar.expander(f"🔧 GitHub calls in this rerun ({len(requests_)})"):
+        st.caption(
+            f"{sum(event['seconds'] for event in requests_) * 1000:.0f} ms on the wire, "
+            f"{sum(event['bytes_in'] for event in requests_) / 1024:.0f} KiB received, "
+            f"{sum(event['cost'] or 0 for event in requests_)} GraphQL points, "
+            f"cache {hits}/{len(lookups)} hits"
+        )
+        if not events:
+            return
+        started = events[0]["at"]
+        st.dataframe(
+            [
+                {
+                    "+ms": round((event["at"] - started) * 1000),
+                    "kind": event["kind"],
+                    "op": event["op"],
+                    "status": event.get("status") or event.get("result") or event.get("error"),
+                    "ms": round(event["seconds"] * 1000) if "seconds" in event else None,
+                    "queued ms": round(event["queued"] * 1000) if "queued" in event else None,
+                    "KiB": round(event["bytes_in"] / 1024, 1) if "bytes_in" in event else None,
+                    "cost": event.get("cost"),
+                }
+                for event in events
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
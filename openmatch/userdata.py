@@ -0,0 +1,83 @@
+"""Per-session holder of the signed-in user's data
+
+Streamlit reruns the whole page on every widget change.  A ``UserData`` is
+kept in the session (``ui.user_data``) for one pair of credentials and loads
+each piece (snapshot, repository names, language profile) at most once; reruns
+read it from memory instead of going back to the caches or to GitHub.  Nothing
+expires on its own: ``invalidate`` drops what it holds, and the upstream cache
+entries with it, so the next read fetches fresh data.
+"""
+import threading
+from collections import defaultdict
+
+from openmatch import languages, snapshot
+
+_MISSING = object()
+
+
+class UserData:
+    def __init__(self, token: str, login: str):
+        self.credentials = (token, login)
+        self._values = {}
+        self._lock = threading.Lock()                 # guards _loading, _generation and _force
+        self._loading = defaultdict(threading.Lock)   # name -> lock held while that piece loads
+        self._generation = 0                          # bumped by invalidate()
+        self._force = False
+
+    def _get(self, name: str, loader):
+        # held values are read without locking, so a rerun never waits for another piece's load
+        value = self._values.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        # dashboard sections read from worker threads: each piece loads once, under its own lock
+        with self._lock:
+            loading = self._loading[name]
+        with loading:
+            value = self._values.get(name, _MISSING)
+            if value is _MISSING:
+                generation = self._generation
+                value = loader()
+                with self._lock:
+                    # loaded before an invalidate() that happened meanwhile: used once, not held
+                    if generation == self._generation:
+                        self._values[name] = value
+            return value
+
+    def snapshot(self) -> dict:
+        token, login = self.credentials
+        return self._get("snapshot", lambda: snapshot.get_user_snapshot(token, login))
+
+    def repository_names(self) -> list:
+        """All of the user's repositories, not just the snapshot's first 100"""
+        token, login = self.credentials
+        snap = self.snapshot()
+        return self._get("repository_names", lambda: snapshot.all_repository_names(token, login, snap))
+
+    def language_profile(self) -> dict:
+        token, login = self.credentials
+        snap = self.snapshot()
+
+        def load():
+            with self._lock:
+                force, generation = self._force, self._generation
+            profile = languages.sync_profile(token, login, force=force, first_page=snapshot.repositories(snap))
+            if force:
+                with self._lock:
+                    # one forced reload per invalidate(); later loads use the language store again
+                    if generation == self._generation:
+                        self._force = False
+            return profile
+
+        return self._get("language_profile", load)
+
+    def top_languages(self, n: int = 5) -> list:
+        return languages.top_languages(self.language_profile(), n)
+
+    def invalidate(self):
+        """Forget everything held; the next reads go to GitHub, not to the caches"""
+        token, login = self.credentials
+        with self._lock:
+            self._values.clear()
+            self._generation += 1
+            self._force = True
+        snapshot.invalidate(token, login)
@@ -1,13 +1,11 @@
 import streamlit as st
-import requests
-from collections import Counter
-import pandas as pd
-import webbrowser
-import json
 import math
+from itertools import zip_longest
+
+from openmatch import avatars, languages, paging, prefetch, profiling, ranking, repo_index, search
+from openmatch.ui import credentials_form, handle_errors, user_data
 
 # constants and configuration
-API_ENDPOINT = "https://api.github.com/graphql"
 DEFAULT_AVATAR = "https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png"
 LICENSES = [
     "Any", "MIT", "GPL-3.0", "GPL-2.0", "Apache-2.0", 
@@ -15,100 +13,26 @@ LICENSES = [
     "LGPL-3.0", "LGPL-2.1", "EPL-2.0", "CDDL-1.1",
     "ISC", "Unlicense", "AGPL-3.0"
 ]
+ISSUES_PAGE_SIZE = 30
+INDEX_PAGE_SIZE = 50
 
-# error handling decorator
-def handle_errors(func):
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except requests.exceptions.RequestException as e:
-            st.error(f"🔌 Network error: {str(e)}")
-        except json.JSONDecodeError:
-            st.error("❌ Invalid API response")
-        except Exception as e:
-            st.error(f"⚠️ Unexpected error: {str(e)}")
-    return wrapper
-  
-# improved language detection with caching
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_most_used_languages(token, name):
-    if not token or not name:
+# language detection from the incrementally synced, byte-weighted profile (held for the session)
+@profiling.phased("fetch")
+def get_most_used_languages(data):
+    if data is None:
         raise ValueError("Missing required credentials")
-        
-    query = """
-    {
-      user(login: "%s") {
-        repositories(first: 100) {
-          nodes {
-            languages(first: 100) {
-              nodes {
-                name
-              }
-            }
-          }
-        }
-      }
-    }
-    """ % name
-    
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    response = requests.post(API_ENDPOINT, json={"query": query}, headers=headers)
-    response.raise_for_status()
-    
-    data = response.json()
-    language_counts = Counter()
-    
-    for repo in data["data"]["user"]["repositories"]["nodes"]:
-        for language in repo["languages"]["nodes"]:
-            language_counts[language["name"]] += 1
-            
-    return [lang[0] for lang in language_counts.most_common(5)]
-
-def getOwnerAvatar(owner, token):
-      # Try to get avatar of the owner or the organization
-
-      headers = {'Authorization': f'bearer {token}'}
-
-      u_query = f"""{{
-        user(login: "{owner}") {{
-          avatarUrl
-        }}
-      }}
-      """
-
-      o_query = f"""{{
-        organization(login: "{owner}") {{
-          avatarUrl
-        }}
-      }}
-      """
-
-      user_response = requests.post(API_ENDPOINT, json={'query': u_query}, headers=headers)
-      org_response = requests.post(API_ENDPOINT, json={'query': o_query}, headers=headers)
-
-      if user_response.status_code == 200:
-        data_u = json.loads(user_response.text)
-        try:
-          return data_u['data']['user']['avatarUrl']
-        except:
-          return None
-      elif org_response.status_code == 200:
-        data_o = json.loads(org_response.text)
-        try:
-          return data_o['data']['organization']['avatarUrl']
-        except:
-          return None
-      else:
-        return None
 
-def get_issues(token, langs, limit=10):
+    return [lang for lang, _ in data.top_languages(5)]
+
+def get_issues(token, langs, limit=10, after=None):
     
-    headers = {"Authorization": f"Bearer {token}"}
-  
     query = """
-  {
-    search(query: " language:""" + " language:".join(langs) + """", type: ISSUE, first: """ + str(limit) + """) {
+  query($q: String!, $first: Int!, $after: String) {
+    search(query: $q, type: ISSUE, first: $first, after: $after) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
       edges {
         node {
           ... on Issue {
@@ -125,123 +49,45 @@ def get_issues(token, langs, limit=10):
         }
       }
     }
-  }
-  """
-    
-    r = requests.post(API_ENDPOINT, json={'query': query}, headers=headers)
-
-    data = json.loads(r.text)
-
-    issues = data['data']['search']['edges']
-
-    return issues
-
-def get_repos(langs, token, filters, limit=10):
-
-  headers = {"Authorization": f"Bearer {token}"}
-  
-  query = ""
-
-  if filters != {}:
-      query_string = ""
-      available_filters = filters.keys()
-
-      final_filters = []
-    
-    
-      language_filters = " ".join([f'language:{lang}' for lang in langs])
-      final_filters.append(language_filters)
-
-      if "topics" in available_filters:
-        if filters["topics"] != "":
-          topics = filters["topics"].split(",")
-          topic_filters = " ".join([f'topic:{topic}' for topic in topics])
-          final_filters.append(topic_filters)
-
-      if "min_stars" in available_filters:
-        min_stars = filters["min_stars"]
-        min_stars_filter = f"stars:>{min_stars}"
-        final_filters.append(min_stars_filter)
-
-      if "min_commits" in available_filters:
-        min_commits = filters["min_commits"]
-        min_commits_filter = f"commits:>{min_commits}"
-        final_filters.append(min_commits_filter)
-
-      if "min_issues" in available_filters:
-        min_issues = filters["min_issues"]
-        min_issues_filter = f"issues:>{min_issues}"
-        final_filters.append(min_issues_filter)
-
-      if "date" in available_filters:
-        date = filters["date"]
-        date_text = filters["date_text"]
-        date_filter = f"created:{date_text}{date}"
-        final_filters.append(date_filter)
-
-      if "order_by" in available_filters:
-        order_by = filters["order_by"]
-        order_by_filter = f"sort:{order_by}"
-        final_filters.append(order_by_filter)
-
-      for f in final_filters:
-        print(f)
-        query_string += f + " "
-
-      query = """
-          {
-            search(query: \" """ + query_string + """ \", type: REPOSITORY, first: """ + str(limit) +""") {
-              edges {
-                node {
-                  ... on Repository {
-                    name
-                    description
-                    owner {
-                      login
-                    }
-                    url
-                  }
-                }
-              }
-            }
-          }
-          """
-      pass
-
-  else:
-  
-    query = """
-  {
-    search(query: "language:""" + " language:".join(langs) + """ ", type: REPOSITORY, first: """ + str(limit) +""") {
-      edges {
-        node {
-          ... on Repository {
-            name
-            description
-            owner {
-              login
-            }
-            url
-          }
-        }
-      }
+    rateLimit {
+      cost
+      remaining
+      resetAt
     }
   }
   """
-
-  r = requests.post(API_ENDPOINT, json={'query': query}, headers=headers)
-
-  data = json.loads(r.text)
-  # return 0
-  print(data)
-
-  repos = data['data']['search']['edges']
-
-  return repos
-
-def get_open_issues(token, langs, limit=10):
     
-    issues = get_issues(token, langs=langs, limit=limit)
+    # canonical, public-only query string: shared by every user who picked the same languages
+    data = search.cached_search(token, "issues", query, {'q': search.query_string(langs), 'first': limit, 'after': after})
+
+    issues = data['search']['edges']
+
+    return issues, data['search']['pageInfo']
+
+def issue_pages(token, langs, per_language=False):
+    """Pager over beginner-friendly issues, one search page per request"""
+    def fetcher(search_langs):
+        def fetch_page(after):
+            issues, page_info = get_issues(token, langs=search_langs, limit=ISSUES_PAGE_SIZE, after=after)
+            return [issue for issue in issues if issue['node']], page_info['endCursor'], page_info['hasNextPage']
+        return fetch_page
+
+    if not per_language:
+        return paging.Pager(fetcher(langs))
+
+    # one search per language, interleaved so no language crowds out the others
+    seen = set()
+    def interleave(pages):
+        merged = []
+        for round_ in zip_longest(*pages.values()):
+            for issue in round_:
+                if issue and issue['node']['url'] not in seen:
+                    seen.add(issue['node']['url'])
+                    merged.append(issue)
+        return merged
+    return paging.merged({lang: fetcher([lang]) for lang in langs}, interleave)
+
+def show_open_issues(issues):
 
     if issues:
         cards_per_row = 3
@@ -272,7 +118,6 @@ def get_open_issues(token, langs, limit=10):
                 index = row * cards_per_row + i
                 if index < len(issues):
                     issue = issues[index]['node']
-                    print(issue.keys())
                     with columns[i]:
                         try:
                           st.write(f"**{issue['title']}**")
@@ -313,188 +158,254 @@ def project_card(repo, index, avatar_url):
     """
     st.markdown(card_html, unsafe_allow_html=True)
     
+# live GitHub search, used when the local index doesn't cover the selected languages
+def search_repositories(token, langs, filters, limit, after=None):
+    return search.repositories(token, langs, filters, limit, after)
+
 #  main function with filters
-@handle_errors
-def get_opensource_projects(token, user, langs, filters, limit=9):
-    if not token or not user:
+def project_pages(data, langs, filters, per_language=False):
+    """Pager over matching projects, best match first (or in the sidebar's "Order By")"""
+    if data is None:
         raise ValueError("GitHub credentials are required")
-    
-    # build query with filters
-    query_parts = [f"language:{lang}" for lang in langs]
-    
-    if filters.get("min_stars"):
-        query_parts.append(f"stars:>={filters['min_stars']}")
-    if filters.get("license") and filters["license"] != "Any":
-        query_parts.append(f"license:{filters['license']}")
-    
-    query = " ".join(query_parts)
-    
-    gql_query = f"""
-    {{
-        search(query: "{query}", type: REPOSITORY, first: {limit}) {{
-            edges {{
-                node {{
-                    ... on Repository {{
-                        name
-                        description
-                        stargazerCount
-                        url
-                        owner {{
-                            login
-                        }}
-                    }}
-                }}
-            }}
-        }}
-    }}
-    """
-    
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.post(API_ENDPOINT, json={"query": gql_query}, headers=headers)
-    response.raise_for_status()
-    
-    data = response.json()
-    repos = [edge["node"] for edge in data["data"]["search"]["edges"]]
-    
+    token = data.credentials[0]
+
+    def profile():
+        return languages.language_bytes(data.language_profile())
+
+    # the local index (see openmatch/repo_index.py) answers in milliseconds once crawled
+    if repo_index.covers(langs) and filters.get("order_by"):
+        # an explicit sort order was asked for, so skip relevance ranking
+        def fetch_page(offset):
+            offset = offset or 0
+            repos = repo_index.search(langs, filters, limit=INDEX_PAGE_SIZE, offset=offset)
+            return repos, offset + len(repos), len(repos) == INDEX_PAGE_SIZE
+    elif repo_index.covers(langs):
+        # every matching row is a candidate; later pages just take more of the same ranking
+        def fetch_page(offset):
+            offset = offset or 0
+            candidates = ranking.index_candidates(langs, filters)
+            weights = profile()
+            with profiling.phase("transform"):
+                repos = ranking.rank(candidates, weights, offset + INDEX_PAGE_SIZE)[offset:]
+            return repos, offset + len(repos), offset + len(repos) < len(candidates)
+    elif per_language:
+        # one (separately cached) search per language at once; each round is merged, deduped and ranked together
+        # (or, with an "Order By", merged in that order)
+        def fetcher(lang):
+            def fetch_page(after):
+                nodes, page_info = search_repositories(token, [lang], filters, search.LANGUAGE_PAGE_SIZE, after)
+                return nodes, page_info["endCursor"], page_info["hasNextPage"]
+            return fetch_page
+
+        seen = set()
+        def merge(pages):
+            if filters.get("order_by"):
+                # every language came back in the asked-for order: keep it, merged
+                merged = search.merge_sorted(list(pages.values()), filters)
+            else:
+                merged = (node for page in pages.values() for node in page)
+            nodes = []
+            for node in merged:
+                if node["id"] not in seen:
+                    seen.add(node["id"])
+                    nodes.append(node)
+            if filters.get("order_by"):
+                return nodes
+            weights = profile()
+            with profiling.phase("transform"):
+                return ranking.rank(ranking.Candidates.from_nodes(nodes), weights, len(nodes))
+        return paging.merged({lang: fetcher(lang) for lang in langs}, merge)
+    elif filters.get("order_by"):
+        # GitHub sorts the search itself (sort: qualifier), so its order is kept
+        def fetch_page(after):
+            nodes, page_info = search_repositories(token, langs, filters, ranking.OVERFETCH, after)
+            return nodes, page_info["endCursor"], page_info["hasNextPage"]
+    else:
+        # over-fetch a search page and rank it; the next page is ranked after it, so shown order never changes
+        def fetch_page(after):
+            nodes, page_info = search_repositories(token, langs, filters, ranking.OVERFETCH, after)
+            weights = profile()
+            with profiling.phase("transform"):
+                repos = ranking.rank(ranking.Candidates.from_nodes(nodes), weights, len(nodes))
+            return repos, page_info["endCursor"], page_info["hasNextPage"]
+    return paging.Pager(fetch_page)
+
+def show_projects(token, repos):
     if not repos:
         return st.info("🚨 No projects found matching your criteria")
     
+    # avatars come back with the search itself; only owners without one cost a (single, batched) lookup
+    for repo in repos:
+        avatars.remember(repo["owner"]["login"], repo["owner"].get("avatarUrl"))
+    missing = [repo["owner"]["login"] for repo in repos if not repo["owner"].get("avatarUrl")]
+    with profiling.phase("fetch"):
+        owner_avatars = avatars.get_owner_avatars(token, missing) if missing else {}
+
     st.subheader("🔍 Matching Open-Source Projects")
     for i, repo in enumerate(repos, 1):
-        avatar_url = getOwnerAvatar(repo["owner"]["login"], token) or DEFAULT_AVATAR
+        owner = repo["owner"]["login"]
+        avatar_url = repo["owner"].get("avatarUrl") or owner_avatars.get(owner) or DEFAULT_AVATAR
         project_card(
             repo=repo,
             index=i,
             avatar_url=avatar_url
         )
 
-# enhanced UI configuration
-st.set_page_config(
-    page_title="OpenMatch - Discover Projects",
-    page_icon="🔍",
-    layout="wide",
-)
-
-st.markdown("""
-    <h1 style='color: white; text-align: center;'>
-        Discover Open-Source Projects
-    </h1>
-    <p style='text-align: center; color: #8b949e;'>
-        Find projects matching your skills and interests
-    </p>
-""", unsafe_allow_html=True)
-
-# improved sidebar filters
-with st.sidebar:
-    st.header("🔎 Filters")
-    token = st.text_input("GitHub Token", type="password")
-    username = st.text_input("GitHub Username")
-    
-    try:
-        langs = get_most_used_languages(token, username) if token and username else []
-    except:
-        langs = []
-    
-    selected_langs = st.multiselect(
-        "Languages", 
-        options=langs,
-        default=langs,
-        help="Select programming languages to filter by"
+# results stay in session state between reruns: "load more" and the display count only fetch missing pages
+def open_results(kind, pager, caption=None):
+    st.session_state["results"] = {"kind": kind, "pager": pager, "batches": 1, "caption": caption}
+
+def load_more():
+    st.session_state["results"]["batches"] += 1
+
+@handle_errors
+def show_results(token, per_batch):
+    results = st.session_state.get("results")
+    if not results:
+        return
+    shown = per_batch * results["batches"]
+    with st.spinner("Loading results..."), profiling.phase("fetch"):
+        # ranking inside the pager is counted as "transform"
+        items = results["pager"].ensure(shown)
+
+    if results["caption"]:
+        st.caption(results["caption"])
+    if results["kind"] == "repos":
+        show_projects(token, items)
+    else:
+        show_open_issues(items)
+
+    if results["pager"].has_more(shown):
+        st.button("⬇️ Load more", on_click=load_more)
+
+# page body: app.py calls render() on every rerun of this page
+def render():
+    # enhanced UI configuration
+    st.set_page_config(
+        page_title="OpenMatch - Discover Projects",
+        page_icon="🔍",
+        layout="wide",
     )
-    
-    with st.expander("Advanced Filters"):
-        min_stars = st.number_input("Minimum Stars", min_value=0, value=10)
-        license_type = st.selectbox("License", LICENSES)
-        show_extra = st.checkbox("Show additional filters")
-    
-    filters = {}
-    if show_extra:
-        chosen_filters = st.multiselect(
-            "Additional filters to apply", 
-            ["Topics", "Minimum Commits", "Minimum Issues", "Date", "Order By"],
-            default=[]
+
+    st.markdown("""
+        <h1 style='color: white; text-align: center;'>
+            Discover Open-Source Projects
+        </h1>
+        <p style='text-align: center; color: #8b949e;'>
+            Find projects matching your skills and interests
+        </p>
+    """, unsafe_allow_html=True)
+
+    # improved sidebar filters
+    with st.sidebar:
+        st.header("🔎 Filters")
+        username, token = credentials_form("GitHub Username", "GitHub Token")
+        # held for the session: filter changes don't fetch the profile again
+        data = user_data(token, username)
+        # start filling the caches in the background before any button is clicked
+        prefetch.warm(token, username)
+        if data is not None and st.button("🔄 Refresh languages", help="Fetch your repositories again"):
+            data.invalidate()
+
+        try:
+            langs = get_most_used_languages(data) if data is not None else []
+        except:
+            langs = []
+
+        selected_langs = st.multiselect(
+            "Languages", 
+            options=langs,
+            default=langs,
+            help="Select programming languages to filter by"
         )
-        
-        if "Topics" in chosen_filters:
-            filters["topics"] = st.text_input(
-                "Enter topics to filter by", 
-                help="Enter topics separated by commas (e.g., hacktoberfest,AI,Rust)"
-            )
-        if "Minimum Commits" in chosen_filters:
-            filters["min_commits"] = st.number_input("Minimum Commits", min_value=0)
-        if "Minimum Issues" in chosen_filters:
-            filters["min_issues"] = st.number_input("Minimum Issues", min_value=0)
-        if "Date" in chosen_filters:
-            filters["date"] = st.date_input("Repository creation date")
-            filters["date_text"] = st.selectbox(
-                "Date filter type", 
-                ["Before", "After", "On"]
+
+        with st.expander("Advanced Filters"):
+            min_stars = st.number_input("Minimum Stars", min_value=0, value=search.DEFAULT_FILTERS["min_stars"])
+            license_type = st.selectbox("License", LICENSES)
+            per_language = st.checkbox(
+                "Search each language separately",
+                value=True,
+                help="One search per language, run at the same time, so no language crowds out the others"
             )
-        if "Order By" in chosen_filters:
-            filters["order_by"] = st.radio(
-                "Sort repositories by", 
-                ["Stars", "Forks", "Recent"]
+            show_extra = st.checkbox("Show additional filters")
+
+        filters = {}
+        if show_extra:
+            chosen_filters = st.multiselect(
+                "Additional filters to apply", 
+                ["Topics", "Minimum Issues", "Date", "Order By"],
+                default=[]
             )
-    
-    st.markdown("---")
-    st.info("💡 Tip: Add more languages to see better matches")
-
-# main content area
-st.markdown("<h2 style='text-align: center; color: white;'>Let's find some open source projects for you to contribute!</h2><br>", 
-            unsafe_allow_html=True)
-
-repo_limit = st.slider(
-    "Number of results to display", 
-    min_value=3, 
-    max_value=30, 
-    value=9, 
-    step=3,
-    help="Choose how many repositories/issues to show"
-)
-
-col1, col2 = st.columns(2)
-with col1:
-    if st.button("🚀 Show Matching Repositories", type="primary"):
-        if not (token and username):
-            st.error("Please enter your GitHub credentials")
-        elif not selected_langs:
-            st.error("Please select at least one language")
-        else:
-            with st.spinner("Searching for matching repositories..."):
-                try:
-                    base_filters = {
-                        "min_stars": min_stars,
-                        "license": license_type
-                    }
-                    if show_extra and filters:
-                        base_filters.update(filters)
-                        
-                    get_opensource_projects(
-                        token=token,
-                        user=username,
-                        langs=selected_langs,
-                        filters=base_filters,
-                        limit=repo_limit
-                    )
-                except Exception as e:
-                    st.error(f"Error searching repositories: {str(e)}")
-
-with col2:
-    if st.button("🐣 Show Good First Issues"):
-        if not (token and username):
-            st.error("Please enter your GitHub credentials")
-        elif not selected_langs:
-            st.error("Please select at least one language")
-        else:
-            with st.spinner("Finding beginner-friendly issues..."):
-                try:
-                    get_open_issues(
-                        token=token,
-                        langs=selected_langs,
-                        limit=repo_limit
-                    )
-                except Exception as e:
-                    st.error(f"Error searching issues: {str(e)}")
-
-if not token or not username:
-    st.warning("Please enter your GitHub credentials in the sidebar to begin")
\ No newline at end of file
+
+            if "Topics" in chosen_filters:
+                filters["topics"] = st.text_input(
+                    "Enter topics to filter by", 
+                    help="Enter topics separated by commas (e.g., hacktoberfest,AI,Rust)"
+                )
+            if "Minimum Issues" in chosen_filters:
+                filters["min_issues"] = st.number_input("Minimum Issues", min_value=0)
+            if "Date" in chosen_filters:
+                filters["date"] = st.date_input("Repository creation date")
+                filters["date_text"] = st.selectbox(
+                    "Date filter type", 
+                    ["Before", "After", "On"]
+                )
+            if "Order By" in chosen_filters:
+                filters["order_by"] = st.radio(
+                    "Sort repositories by", 
+                    ["Stars", "Forks", "Recent"]
+                )
+
+        st.markdown("---")
+        st.info("💡 Tip: Add more languages to see better matches")
+
+    # main content area
+    st.markdown("<h2 style='text-align: center; color: white;'>Let's find some open source projects for you to contribute!</h2><br>", 
+                unsafe_allow_html=True)
+
+    repo_limit = st.slider(
+        "Number of results to display", 
+        min_value=3, 
+        max_value=30, 
+        value=9, 
+        step=3,
+        help="Choose how many repositories/issues to show at a time ('Load more' adds as many again)"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🚀 Show Matching Repositories", type="primary"):
+            if not (token and username):
+                st.error("Please enter your GitHub credentials")
+            elif not selected_langs:
+                st.error("Please select at least one language")
+            else:
+                base_filters = {
+                    "min_stars": min_stars,
+                    "license": license_type
+                }
+                if show_extra and filters:
+                    base_filters.update(filters)
+
+                caption = None
+                if repo_index.covers(selected_langs):
+                    caption = f"⚡ From the local repository index (crawled {repo_index.last_crawl()})"
+                open_results("repos", project_pages(data, selected_langs, base_filters, per_language), caption)
+
+    with col2:
+        if st.button("🐣 Show Good First Issues"):
+            if not (token and username):
+                st.error("Please enter your GitHub credentials")
+            elif not selected_langs:
+                st.error("Please select at least one language")
+            else:
+                open_results("issues", issue_pages(token, selected_langs, per_language))
+
+    show_results(token, repo_limit)
+
+    if not token or not username:
+        st.warning("Please enter your GitHub credentials in the sidebar to begin")
+
+
+if __name__ == "__main__":
+    render()
@@ -1,168 +1,101 @@
-import base64
-from datetime import datetime, timedelta
 import streamlit as st
-import requests
-from collections import Counter
+from datetime import date
 import pandas as pd
-import webbrowser
-import json
-import plotly.express as px
+
+from openmatch import analytics, commits, contributions, dashboard, events, prefetch, profiling, snapshot
+from openmatch.ui import credentials_form, show_error, user_data
 
 #  centralized constants
-API_ENDPOINT = "https://api.github.com/graphql"
 DEFAULT_AVATAR = "https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png"
-
-# error handling decorator
-def handle_errors(func):
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except requests.exceptions.RequestException as e:
-            st.error(f"🔌 Network error: {str(e)}")
-        except json.JSONDecodeError:
-            st.error("❌ Invalid API response")
-        except Exception as e:
-            st.error(f"⚠️ Unexpected error: {str(e)}")
-    return wrapper
+MAX_HISTORY_DAYS = 10 * 365
+DEFAULT_HISTORY_DAYS = 125
 
 # fix_json_values with type hints
 def fix_json_values(json_to_fix: dict) -> dict:
     """Convert boolean/None values to human-readable strings"""
     conversions = {
         "False": "No",
-        "None": "Not Available", 
+        "None": "Not Available",
         "True": "Yes"
     }
     return {k: conversions.get(str(v), v) for k, v in json_to_fix.items()}
 
-# data fetching
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_most_used_languages(token: str, name: str, appendRender: bool = True):
-    """Fetch user's most used programming languages"""
-    headers = {"Authorization": f"Bearer {token}"}
-    query = """{
-      user(login: "%s") {
-        repositories(first: 100) {
-          nodes {
-            languages(first: 100) {
-              nodes {
-                name
-              }
-            }
-          }
+# data fetching (no Streamlit calls here: load_dashboard runs these on the dashboard thread pool).
+# Profile, calendar, PRs and languages all start from the session's user snapshot.
+def get_user_info(snap: dict) -> dict:
+    """Comprehensive user statistics"""
+    return snapshot.user(snap)
+
+                # repo functions
+def fetch_custom_commit_history(selected_repo, name, token):
+    """Full commit history of a repository, synced to (and read from) the local commit store"""
+    commits.sync(token, name, selected_repo)
+    return commits.load(token, name, selected_repo)
+
+def fetch_commit_history(token, name, snap, num_days) -> analytics.ContributionStats:
+    """Daily commit activity over the last `num_days` days (None: since the account was created)"""
+    since = date.fromisoformat(snapshot.user(snap)["createdAt"][:10])
+    # the snapshot already holds the last year, so a first visit only fetches older years
+    contributions.seed(token, name, snapshot.contribution_days(snap))
+    return analytics.for_user(token, name, num_days, since=since)
+
+@profiling.phased("transform")
+def get_pull_requests(snap) -> pd.DataFrame:
+    """Pull request counts per repository"""
+    return pd.DataFrame(snapshot.pull_requests_by_repository(snap), columns=["Repository", "Pull Requests"])
+
+def get_top_languages(data):
+    """Five most used languages from the session's language profile (loaded on first use)"""
+    return data.top_languages(5)
+
+def get_most_active_day(token, name):
+    """Activity per weekday and per hour from every public event collected so far"""
+    return events.patterns(events.sync(token, name))
+
+# rendering
+def show_languages(most_common):
+    with profiling.phase("transform"):
+        df_languages = pd.DataFrame(most_common, columns=["Language", "Bytes"]).set_index("Language")
+    st.subheader("Most Used Languages")
+    st.bar_chart(df_languages)
+
+def show_user_info(user_data, activity):
+    """Display comprehensive user statistics"""
+    import plotly.express as px  # ~0.1s on first use, so only pages that chart pay for it
+
+    stats = {
+        "public_repos": user_data.get('publicRepos', {}).get('totalCount', 0),
+        "private_repos": user_data.get('privateRepos', {}).get('totalCount', 0),
+        "total_contributions": user_data.get('contributionsCollection', {}).get('contributionCalendar', {}).get('totalContributions', 0),
+        "issues": user_data.get('issues', {}).get('totalCount', 0),
+        "pull_requests": user_data.get('pullRequests', {}).get('totalCount', 0),
+        "commits": user_data.get('contributionsCollection', {}).get('totalCommitContributions', 0)
         }
-      }
-    }""" % name
-
-    try:
-        response = requests.post(API_ENDPOINT, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        language_counts = Counter()
-        for repo in data["data"]["user"]["repositories"]["nodes"]:
-            for language in repo["languages"]["nodes"]:
-                language_counts[language["name"]] += 1
-
-        most_common = language_counts.most_common(5)
-        df_languages = pd.DataFrame(most_common, columns=["Language", "Count"])
-
-        if appendRender:
-            st.subheader("Most Used Languages")
-            st.bar_chart(df_languages.set_index("Language"))
-        else:
-            return [lang[0] for lang in most_common]
-
-    except Exception as e:
-        st.error(f"Error fetching languages: {e}")
-        return [] if not appendRender else None
-
-@handle_errors
-def get_user_info(token: str, name: str):
-    """Fetch and display comprehensive user statistics"""
-    query = f"""query {{
-        user(login: "{name}") {{
-            name
-            email
-            avatarUrl
-            bio
-            createdAt
-            location
-            websiteUrl
-            publicRepos: repositories(isFork: false, privacy: PUBLIC) {{
-                totalCount
-            }}
-            privateRepos: repositories(isFork: false, privacy: PRIVATE) {{
-                totalCount
-            }}
-            pullRequests {{
-            totalCount
-            }}
-            contributionsCollection {{
-                totalCommitContributions
-                totalIssueContributions
-                totalPullRequestContributions 
-                contributionCalendar {{
-                    totalContributions
-                    weeks {{
-                        contributionDays {{
-                            date
-                            contributionCount
-                            weekday
-                        }}
-                    }}
-                }}
-            }}
-            issues {{
-                totalCount
-            }}
-        }}
-    }}"""
-
-    headers = {"Authorization" : f"Bearer {token}"}
-
-    try:
-        response = requests.post(
-            API_ENDPOINT,
-            headers=headers,
-            json={"query": query},
-        )
-        response.raise_for_status()
-        data = response.json()
-        user_data = data.get("data", {}).get("user", {})
-
-        stats = {
-            "public_repos": user_data.get('publicRepos', {}).get('totalCount', 0),
-            "private_repos": user_data.get('privateRepos', {}).get('totalCount', 0),
-            "total_contributions": user_data.get('contributionsCollection', {}).get('contributionCalendar', {}).get('totalContributions', 0),
-            "issues": user_data.get('issues', {}).get('totalCount', 0),
-            "pull_requests": user_data.get('pullRequests', {}).get('totalCount', 0),
-            "commits": user_data.get('contributionsCollection', {}).get('totalCommitContributions', 0)
-            }
-                 
+
 # improved visualization
-            # profile header
-        with st.container():
-            cols = st.columns([1, 4])
-            with cols[0]:
-                st.image(user_data.get('avatarUrl', DEFAULT_AVATAR), width=100)
-                
-            with cols[1]:
-                st.subheader(user_data.get('name', 'N/A'))
-                if user_data.get('bio'):
-                    st.caption(user_data['bio'])
-                st.caption(f"📍 {user_data.get('location', 'Not specified')}")
-
-            # stats cards
-            st.subheader("📊 Activity Overview")
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Public Repos", stats['public_repos'])
-            col2.metric("Private Repos", stats['private_repos'])
-            col3.metric("Total Contributions", stats['total_contributions'])
-            col4.metric("Issues Created", stats['issues'])
-            
-            # enhanced charts
-            # 1. Repo Distribution Pie Chart
+        # profile header
+    with st.container():
+        cols = st.columns([1, 4])
+        with cols[0]:
+            st.image(user_data.get('avatarUrl', DEFAULT_AVATAR), width=100)
+
+        with cols[1]:
+            st.subheader(user_data.get('name', 'N/A'))
+            if user_data.get('bio'):
+                st.caption(user_data['bio'])
+            st.caption(f"📍 {user_data.get('location', 'Not specified')}")
+
+        # stats cards
+        st.subheader("📊 Activity Overview")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Public Repos", stats['public_repos'])
+        col2.metric("Private Repos", stats['private_repos'])
+        col3.metric("Total Contributions", stats['total_contributions'])
+        col4.metric("Issues Created", stats['issues'])
+
+        # enhanced charts
+        # 1. Repo Distribution Pie Chart
+        with profiling.phase("figure"):
             fig_repos = px.pie(
                 names=['Public', 'Private'],
                 values=[stats['public_repos'], stats['private_repos']],
@@ -171,36 +104,27 @@ def get_user_info(token: str, name: str):
                 color_discrete_sequence=['#1f6feb', '#58a6ff']  # GitHub colors
             )
             fig_repos.update_traces(textposition='inside', textinfo='percent+label')
-            
-            # 2. Contributions Heatmap
-            contrib_data = []
-            weeks = user_data.get('contributionsCollection', {}).get('contributionCalendar', {}).get('weeks', [])
-            for week in weeks:
-                for day in week.get("contributionDays", []):
-                    contrib_data.append({
-                        "Date": day["date"],
-                    "Contributions": day["contributionCount"],
-                    "Day": day["weekday"]
-                })
-                    
-        df_contrib = pd.DataFrame(contrib_data)
-        if not df_contrib.empty:
-            df_contrib["Date"] = pd.to_datetime(df_contrib["Date"])
-            fig_heatmap = px.density_heatmap(
-                df_contrib,
-                x="Day",
-                y=df_contrib["Date"].dt.strftime("%Y-W%V"),
-                z="Contributions",
-                color_continuous_scale="blues"
-        )
-        fig_heatmap.update_layout(title="Contribution Heatmap")
+
+        # 2. Contributions Heatmap (precomputed week x weekday matrix)
+    if len(activity):
+        with profiling.phase("figure"):
+            fig_heatmap = px.imshow(
+                activity.week_matrix,
+                x=analytics.WEEKDAYS,
+                y=activity.week_labels,
+                color_continuous_scale="blues",
+                aspect="auto",
+                labels={"x": "Day", "y": "Week", "color": "Contributions"},
+            )
+            fig_heatmap.update_layout(title="Contribution Heatmap")
         st.plotly_chart(fig_heatmap, use_container_width=True)
-        
-            # 3. Activity Bar Chart
-        activity_data = {
-            "Type": ["Commits", "PRs", "Issues"],
-            "Count": [stats['commits'], stats['pull_requests'], stats['issues']]
-        }
+
+        # 3. Activity Bar Chart
+    activity_data = {
+        "Type": ["Commits", "PRs", "Issues"],
+        "Count": [stats['commits'], stats['pull_requests'], stats['issues']]
+    }
+    with profiling.phase("figure"):
         fig_activity = px.bar(
             activity_data,
             x="Type",
@@ -209,209 +133,178 @@ def get_user_info(token: str, name: str):
             title="Activity Breakdown",
             color_discrete_sequence=['#1f6feb', '#58a6ff', '#2ea043']
         )
-        
-        # Display all charts
-        st.plotly_chart(fig_repos, use_container_width=True)
-        st.plotly_chart(fig_activity, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"Error fetching user info: {str(e)}")
-        if st.toggle("Show details"):
-             st.exception(e)
-                
-                # repo functions                                
-def fetch_custom_commit_history(selected_repo, name, token):
-    """Get detailed commit history for a specific repository"""
-    headers = {"Authorization": f"Bearer {token}"}
-
-    query = """
-    {
-        repository(owner: "%s", name: "%s") {
-            defaultBranchRef {
-                target {
-                    ... on Commit {
-                        history {
-                            totalCount
-                            nodes {
-                                oid
-                                message
-                                committedDate
-                            }
-                        }
-                    }
-                }
-            }
-        }
-    }
-    """ % (name, selected_repo)
-
-    try:
-        response = requests.post(API_ENDPOINT, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        commit_nodes = data["data"]["repository"]["defaultBranchRef"]["target"]["history"]["nodes"]
-        return {
-            "OID": [commit["oid"] for commit in commit_nodes],
-            "Message": [commit["message"] for commit in commit_nodes],
-            "Date": [commit["committedDate"] for commit in commit_nodes],
-            "Commit Count": list(range(1, len(commit_nodes) + 1))
-        }
 
-    except Exception as e:
-        print(e)
-        st.error(f"bro, see error: {e}")
-        return 
+    # Display all charts
+    st.plotly_chart(fig_repos, use_container_width=True)
+    st.plotly_chart(fig_activity, use_container_width=True)
 
-@handle_errors
-def fetch_commit_history(token, name, num_days):
+def show_commit_activity(activity):
     """Show commit activity over time"""
     st.title("Your last commits (details)")
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-
-    query = """
-    {
-      user(login: "%s") {
-        contributionsCollection(from: "%sT00:00:00Z", to: "%sT23:59:59Z") {
-          contributionCalendar {
-            totalContributions
-            weeks {
-              contributionDays {
-                date
-                contributionCount
-              }
-            }
-          }
-        }
-      }
-    }
-    """ % (name, (datetime.now() - timedelta(days=num_days)).date(), datetime.now().date())
-
-    try:
-        response = requests.post(API_ENDPOINT, headers=headers, json={"query": query})
-        response.raise_for_status()
-        data = response.json()
-
-        contributions = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"]
-        commit_data = pd.DataFrame(
-            [
-                (datetime.strptime(day["date"], "%Y-%m-%d").date(), day["contributionCount"])
-                for week in contributions
-                for day in week["contributionDays"]
-            ],
-            columns=["Date", "Commits"]
-        )
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Contributions", activity.total)
+    col2.metric("Current Streak", f"{activity.current_streak} days")
+    col3.metric("Longest Streak", f"{activity.longest_streak} days")
+    col4.metric("Busiest Day", activity.busiest_weekday())
 
-        st.subheader("Recent Commits")
-        st.write(commit_data)
+    with profiling.phase("transform"):
+        commit_data = activity.frame()
+        chart_data = commit_data.drop(columns="Percentile")
+    st.subheader("Recent Commits")
+    st.write(commit_data)
 
-        st.subheader("Commit History Chart")
-        st.line_chart(commit_data.set_index("Date")["Commits"])
-        
-    except Exception as e:
-        st.error(f"Error occurred while fetching commit history: {e}")
+    st.subheader("Commit History Chart")
+    st.line_chart(chart_data)
 
-@handle_errors
-def get_pull_requests(token, name):
+def show_pull_requests(df):
     """Visualize pull request activity"""
-    headers = {"Authorization": f"Bearer {token}"}
-
-    query = """
-    {
-        user(login: "%s") {
-            contributionsCollection {
-                pullRequestContributionsByRepository {
-                    contributions {
-                        totalCount
-                    }
-                    repository {
-                        name
-                    }
-                }
-            }
-        }
-    }
-    """ % name
-
-    try:
-        response = requests.post(API_ENDPOINT, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        contributions = data["data"]["user"]["contributionsCollection"]["pullRequestContributionsByRepository"]
-
-        repository_names = [contribution["repository"]["name"] for contribution in contributions]
-        pull_request_counts = [contribution["contributions"]["totalCount"] for contribution in contributions]
-
-        df = pd.DataFrame({"Repository": repository_names, "Pull Requests": pull_request_counts})
+    import plotly.express as px
 
-        st.subheader("Pull Requests Over Time")
+    st.subheader("Pull Requests Over Time")
+    with profiling.phase("figure"):
         fig = px.bar(df, x="Repository", y="Pull Requests", title="Pull Requests Over Time")
-        st.plotly_chart(fig)
+    st.plotly_chart(fig)
 
-    except Exception as e:
-        st.error(f"Error occurred while fetching pull request data: {e}")
+def show_most_active_days(most_active_days):
+    """Show weekly and daily activity patterns"""
+    per_weekday, per_hour = most_active_days
+    if per_weekday.sum():
+        with profiling.phase("transform"):
+            df_days = pd.DataFrame({"Day": analytics.WEEKDAYS, "Events": per_weekday}).set_index("Day")
+            df_hours = pd.DataFrame({"Hour": range(24), "Events": per_hour}).set_index("Hour")
+        st.subheader("Most Active Days")
+        st.line_chart(df_days)
 
-@handle_errors
-def get_most_active_day(token, name):
-    """Show weekly activity patterns"""
-    api_end_point = f"{API_ENDPOINT}/users/{name}/events"
-    headers = {"Authorization": f"Token {token}"}
-
-    try:
-        response = requests.get(api_end_point, headers=headers)
-        response.raise_for_status()
-        events = response.json()
+        st.subheader("Most Active Hours (UTC)")
+        st.bar_chart(df_hours)
+    else:
+        st.info("No commit/push activity found.")
 
-        day_counter = Counter()
-        for event in events:
-            day = pd.Timestamp(event["created_at"]).day_name()
-            day_counter[day] += 1
 
-        most_active_days = day_counter.most_common()
-        if most_active_days:
-            st.subheader("Most Active Days")
+RECENT_COMMITS_SHOWN = 500
 
-            df_days = pd.DataFrame(most_active_days, columns=["Day", "Commits/Pushes"])
-
-            st.line_chart(df_days.set_index("Day"))
-        else:
-            st.info("No commit/push activity found.")
-    except Exception as e:
-        st.error(f"Error occurred while fetching most active days: {e}")
-
-
-def get_csv_download_link(df):
-    """Generate download link for DataFrame"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="commit_history.csv">Download CSV</a>'
-    return href
-    
-def show_commit_history(selected_repo, name, token):
+def show_commit_history(selected_repo, commit_data):
     """Display commit history for a repository"""
+    import plotly.express as px
+
     if selected_repo:
         st.subheader(f"Stats are here, boss for : {selected_repo}")
 
-        commit_data = fetch_custom_commit_history(selected_repo, name, token)
         if commit_data is not None:
             st.subheader(f'Commit History for {selected_repo}')
+            st.caption(f"{len(commit_data):,} commits on the default branch")
+
+            with profiling.phase("transform"):
+                recent = commit_data.iloc[::-1].head(RECENT_COMMITS_SHOWN)
+                recent = recent[["oid", "committed_date", "author_name", "additions", "deletions", "changed_files", "message"]]
+                # one point per day keeps the chart light for histories with tens of thousands of commits
+                per_day = commit_data["committed_date"].dt.floor("D").value_counts().sort_index()
+                churn = commit_data.set_index("committed_date")[["additions", "deletions"]].astype("float").resample("W").sum()
+                csv = commit_data.to_csv(index=False)
+            st.write(recent)
+
+            with profiling.phase("figure"):
+                fig = px.line(x=per_day.index, y=per_day.cumsum().values, labels={"x": "Date", "y": "Commit Count"}, title="Commit History")
+            st.plotly_chart(fig)
 
-            
-            commit_df = pd.DataFrame(commit_data)
-            st.write(commit_df)
+            if not churn.empty:
+                st.subheader("Lines Changed per Week")
+                st.bar_chart(churn)
 
-            
-            fig = px.line(commit_df, x="Date", y="Commit Count", title="Commit History")
-            st.plotly_chart(fig)
+            st.download_button(
+                "Download CSV",
+                csv,
+                file_name=f"{selected_repo}_commit_history.csv",
+                mime="text/csv",
+            )
 
-            
-            st.markdown(get_csv_download_link(commit_df), unsafe_allow_html=True)
 
+# dashboard loader: every requested section is fetched on the pool and drawn as it arrives
+SECTION_ORDER = ["profile", "commits", "pull_requests", "active_days", "repository", "languages"]
+PROFILE_DAYS = 364
+#  jobs each section is drawn from; "history" and "languages" start once the snapshot lands
+SECTION_JOBS = {
+    "profile": ["snapshot", "history"],
+    "commits": ["snapshot", "history"],
+    "pull_requests": ["snapshot"],
+    "active_days": ["active_days"],
+    "repository": ["repository"],
+    "languages": ["snapshot", "languages"],
+}
+
+def fetch_plan(data, num_days, sections, selected_repo=None):
+    """Every fetch ``sections`` need, on the pool: yields ``(job, result, error)`` as each lands
+
+    The jobs that need the snapshot (commit history windows, languages) start
+    as soon as it arrives.
+    """
+    token, name = data.credentials
+    needed = {job for section in sections for job in SECTION_JOBS[section]}
+    windows = [days for section, days in (("profile", PROFILE_DAYS), ("commits", num_days)) if section in sections]
+
+    def follow_ups(snap):
+        jobs = {}
+        if windows:
+            # one job: the second window is read from the calendar store the first one filled
+            jobs["history"] = lambda: {days: fetch_commit_history(token, name, snap, days) for days in windows}
+        if "languages" in needed:
+            jobs["languages"] = lambda: get_top_languages(data)
+        return jobs
+
+    initial = {
+        "snapshot": data.snapshot,
+        "active_days": lambda: get_most_active_day(token, name),
+        "repository": lambda: fetch_custom_commit_history(selected_repo, name, token),
+    }
+    pending = dashboard.FanOut({job: fetch for job, fetch in initial.items() if job in needed})
+    for job, result, error in pending:
+        if job == "snapshot" and error is None:
+            pending.add(follow_ups(result))
+        yield job, result, error
+
+def load_dashboard(data, num_days, sections, selected_repo=None):
+    """Fetch all requested sections concurrently and render each one as soon as it lands"""
+    results = {}
+    renderers = {
+        "profile": lambda: show_user_info(get_user_info(results["snapshot"]), results["history"][PROFILE_DAYS]),
+        "commits": lambda: show_commit_activity(results["history"][num_days]),
+        "pull_requests": lambda: show_pull_requests(get_pull_requests(results["snapshot"])),
+        "active_days": lambda: show_most_active_days(results["active_days"]),
+        "repository": lambda: show_commit_history(selected_repo, results["repository"]),
+        # weighted by bytes of code
+        "languages": lambda: show_languages(results["languages"]),
+    }
 
-# UI and button logic
-def main():
+    # reserve a slot per section up front so the page layout doesn't depend on arrival order
+    slots = {}
+    for section in SECTION_ORDER:
+        if section in sections:
+            if section == "languages":
+                st.divider()
+            slots[section] = st.empty()
+            slots[section].caption("⏳ Loading...")
+    errors = {}
+    # the script thread only waits here: the fetches themselves run on the pool
+    for job, result, error in profiling.timed(fetch_plan(data, num_days, list(slots), selected_repo)):
+        if error is not None:
+            errors[job] = error
+        else:
+            results[job] = result
+        for section in [section for section in slots if job in SECTION_JOBS[section]]:
+            failed = next((errors[needs] for needs in SECTION_JOBS[section] if needs in errors), None)
+            if failed is None and not all(needs in results for needs in SECTION_JOBS[section]):
+                continue
+            with slots[section].container():
+                try:
+                    if failed is not None:
+                        raise failed
+                    renderers[section]()
+                except Exception as e:
+                    show_error(e)
+
+
+# UI and button logic: app.py calls render() on every rerun of this page
+def render():
     st.set_page_config(
         page_title="GitHub Stats",
         page_icon="🎯",
@@ -424,44 +317,39 @@ def main():
     # sidebar controls
     with st.sidebar:
         st.header("🔑 GitHub Credentials")
-        githubName = st.text_input(
+        githubName, token = credentials_form(
             "Username",
-            help="Your public GitHub username"
-        )
-        token = st.text_input(
-            "Access Token", 
-            type="password",
-            help="Required for private repositories"
+            "Access Token",
+            name_help="Your public GitHub username",
+            token_help="Required for private repositories"
         )
+        # held for the session: reruns (slider, buttons...) don't fetch it again
+        data = user_data(token, githubName)
+        # start filling the caches in the background before any button is clicked
+        prefetch.warm(token, githubName)
         num_days = st.slider(
-            "Commit History Days", 
+            "Commit History Days",
             min_value=7,
-            max_value=365,
-            value=125,
+            max_value=MAX_HISTORY_DAYS,
+            value=DEFAULT_HISTORY_DAYS,
             help="Time window for commit analysis"
         )
-        
+        if st.checkbox("Entire history", help="Every day since the account was created"):
+            num_days = None
+
         if st.button("Get Token Help"):
+            import webbrowser
             webbrowser.open("https://github.com/settings/tokens")
-            
-        # repository selector
+
+        if data is not None and st.button("🔄 Refresh data", help="Fetch your profile and repositories again"):
+            data.invalidate()
+
+        # repository selector (every repository, listed once per session)
         try:
-            if token and githubName:
-                headers = {"Authorization": f"Bearer {token}"}
-                query = """{
-                    user(login: "%s") {
-                        repositories(first: 100) {
-                            nodes {
-                                name
-                            }
-                        }
-                    }
-                }""" % githubName
-                response = requests.post(API_ENDPOINT, json={"query": query}, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                repo_names = [repo["name"] for repo in data["data"]["user"]["repositories"]["nodes"]]
-                
+            if data is not None:
+                with profiling.phase("fetch"):
+                    repo_names = data.repository_names()
+
                 st.divider()
                 selected_repo = st.selectbox(
                     "Analyze Repository",
@@ -471,43 +359,55 @@ def main():
         except Exception:
             pass
     # main action buttons
-    col1, col2, col3, col4 = st.columns(4)
+    sections = []
+    col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
         if st.button("👤 Profile Overview", help="Show user stats and activity"):
             if githubName and token:
-                get_user_info(token, githubName)
+                sections.append("profile")
             else:
                 st.error("Missing credentials")
-                
+
     with col2:
         if st.button("📅 Recent Commits", help="Show recent commit activity"):
             if githubName and token:
-                fetch_commit_history(token, githubName, num_days)
+                sections.append("commits")
             else:
                 st.error("Missing credentials")
 
     with col3:
         if st.button("🔄 Activity Stats", help="Show PRs and activity patterns"):
             if githubName and token:
-                get_pull_requests(token, githubName)
-                get_most_active_day(token, githubName)
+                sections += ["pull_requests", "active_days"]
             else:
                 st.error("Missing credentials")
-                
+
     with col4:
         if st.button("📊 Repository Analysis", help="Analyze specific repository"):
             if githubName and token and 'repo_selector' in st.session_state:
-                show_commit_history(st.session_state.repo_selector, githubName, token)
+                sections.append("repository")
+            else:
+                st.error("Select a repository first")
+
+    with col5:
+        if st.button("⚡ Full Dashboard", help="Load every section at once"):
+            if githubName and token:
+                sections += ["profile", "commits", "pull_requests", "active_days"]
+                if 'repo_selector' in st.session_state:
+                    sections.append("repository")
             else:
-                st.error("Select a repository first")   
-                
-    
+                st.error("Missing credentials")
+
+
         # language analysis section
-    if githubName and token:
-        st.divider()
-        get_most_used_languages(token, githubName)
-                
-                
-                
+    if data is not None:
+        sections.append("languages")
+        load_dashboard(
+            data, num_days, sections,
+            selected_repo=st.session_state.get('repo_selector')
+        )
+
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    render()